@@ -0,0 +1,50 @@
+"""Blocklist check throughput (events/s) as the list grows, against a linear scan
+
+Usage: python benchmarks/bench_blocklist.py [--entries 100,1000,10000,50000] [--events N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blocklist import Blocklist
+from testkit.reference import linear_check
+from testkit.synthetic import EventGenerator, synthetic_signatures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', default='100,1000,10000,50000')
+    parser.add_argument('--events', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    generator = EventGenerator(args.seed)
+    events = list(generator.entries(args.events))
+    for count in [int(value) for value in args.entries.split(',')]:
+        blocklist = Blocklist()
+        actions = ('flag', 'suppress')
+        blocklist.entries = {signature: {'action': actions[i % 2], 'added': 0, 'note': ''}
+                             for i, signature in enumerate(synthetic_signatures(count, generator, args.seed))}
+
+        batch = [dict(event) for event in events]
+        start = time.perf_counter()
+        kept = blocklist.apply(batch)
+        seconds = time.perf_counter() - start
+        print(f"{count:>7,} entries: {len(batch) / seconds:>10,.0f} events/s, "
+              f"{blocklist.flagged:,} flagged, {blocklist.suppressed:,} suppressed, {len(kept):,} kept")
+
+        if count:
+            entries = [(signature, entry['action']) for signature, entry in blocklist.entries.items()]
+            sample = events[:200]
+            start = time.perf_counter()
+            for log in sample:
+                linear_check(entries, log)
+            linear_seconds = time.perf_counter() - start
+            print(f"{'':>17}linear scan: {len(sample) / linear_seconds:>10,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Feed a synthetic file-event burst through EventCoalescer and count events in vs out
+
+Usage: python benchmarks/bench_coalescer.py [--documents N] [--seed S]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest import EventCoalescer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def burst(documents, rng):
+    """Yield (dt, event_type, src, dest) the way editors, builds and unzips produce them"""
+    root = os.path.join('C:\\', 'Users', 'me')
+    for i in range(documents):
+        doc = os.path.join(root, 'Documents', f"report_{i}.docx")
+        kind = rng.random()
+        if kind < 0.4:
+            # Editor save: lock file, several modifies, temp write renamed into place
+            lock = os.path.join(root, 'Documents', f"~$report_{i}.docx")
+            tmp = os.path.join(root, 'Documents', f"~WRL{i:04d}.tmp")
+            yield 0.001, 'created', lock, None
+            for _ in range(rng.randint(2, 6)):
+                yield 0.002, 'modified', doc, None
+            yield 0.001, 'created', tmp, None
+            yield 0.001, 'modified', tmp, None
+            yield 0.001, 'moved', tmp, doc
+            yield 0.001, 'deleted', lock, None
+        elif kind < 0.7:
+            # Build output: object file rewritten many times
+            obj = os.path.join(root, 'src', 'build', f"unit_{i}.obj")
+            yield 0.001, 'created', obj, None
+            for _ in range(rng.randint(5, 20)):
+                yield 0.0005, 'modified', obj, None
+        elif kind < 0.9:
+            # Explorer cut/paste across folders: delete + create
+            src = os.path.join(root, 'Downloads', f"photo_{i}.jpg")
+            dest = os.path.join(root, 'Pictures', f"photo_{i}.jpg")
+            yield 0.001, 'deleted', src, None
+            yield 0.001, 'created', dest, None
+            yield 0.001, 'modified', dest, None
+        else:
+            # Plain deletion
+            yield 0.001, 'deleted', os.path.join(root, 'Desktop', f"old_{i}.txt"), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--documents', type=int, default=50_000)
+    parser.add_argument('--window', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    clock = FakeClock()
+    emitted = []
+    coalescer = EventCoalescer(lambda *event: emitted.append(event), window=args.window, clock=clock)
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    peak_pending = 0
+    for dt, event_type, src, dest in burst(args.documents, rng):
+        clock.now += dt
+        coalescer.add(event_type, src, dest)
+        if coalescer.events_in % 1000 == 0:
+            coalescer.flush()
+            peak_pending = max(peak_pending, len(coalescer.pending))
+    coalescer.flush(force=True)
+    elapsed = time.perf_counter() - start
+
+    by_type = {}
+    for event_type, *_ in emitted:
+        by_type[event_type] = by_type.get(event_type, 0) + 1
+
+    print(f"events in:       {coalescer.events_in:,}")
+    print(f"events out:      {coalescer.events_out:,} ({coalescer.events_out / coalescer.events_in:.1%})")
+    print(f"by type:         {by_type}")
+    print(f"peak pending:    {peak_pending:,} paths (cap {coalescer.max_pending:,})")
+    print(f"throughput:      {coalescer.events_in / elapsed:,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
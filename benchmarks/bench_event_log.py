@@ -0,0 +1,71 @@
+"""Bookmarked event log reads: backfill, incremental refreshes and working off a backlog
+
+Usage: python benchmarks/bench_event_log.py [--records N] [--new N] [--backlog N] [--backfill N]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collectors import BookmarkStore, EventLogReader
+from testkit.stubs import FakeEventLog
+
+KEY = 'get_event_logs:Security'
+
+
+def timed_read(reader):
+    pages = reader.pages_read
+    start = time.perf_counter()
+    records = reader.read()
+    for record in records:
+        reader.mark(record)
+    elapsed = time.perf_counter() - start
+    reader.commit()
+    return records, elapsed, reader.pages_read - pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=1_000_000, help="records already in the log")
+    parser.add_argument('--new', type=int, default=2_000, help="records added between refreshes")
+    parser.add_argument('--backlog', type=int, default=50_000, help="records added while not running")
+    parser.add_argument('--backfill', type=int, default=500)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='event-log-bench-')
+    try:
+        path = os.path.join(root, 'bookmarks.json')
+        log = FakeEventLog()
+        log.append(args.records)
+        reader = EventLogReader(log, BookmarkStore(path), KEY, backfill=args.backfill)
+
+        records, elapsed, pages = timed_read(reader)
+        print(f"backfill:        {len(records):,} of {len(log.records):,} records, {pages} pages, "
+              f"{elapsed * 1000:.1f} ms")
+        records, elapsed, pages = timed_read(reader)
+        print(f"idle refresh:    {len(records):,} records, {pages} pages, {elapsed * 1000:.2f} ms")
+        log.append(args.new)
+        records, elapsed, pages = timed_read(reader)
+        print(f"refresh (+{args.new:,}):  {len(records):,} records, {pages} pages, {elapsed * 1000:.1f} ms")
+
+        log.append(args.backlog)
+        refreshes, total, slowest = 0, 0, 0.0
+        while True:
+            records, elapsed, pages = timed_read(reader)
+            if not records:
+                break
+            refreshes += 1
+            total += len(records)
+            slowest = max(slowest, elapsed)
+        print(f"backlog (+{args.backlog:,}): {total:,} records over {refreshes} refreshes of at most "
+              f"{reader.max_records:,}, slowest {slowest * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Flow table poll cost at several connection counts
+
+Usage: python benchmarks/bench_flows.py [--connections 1000,10000] [--churn N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flows import FlowTable
+from testkit.stubs import Address, Connection, fake_psutil
+
+
+def connection(i, status='ESTABLISHED'):
+    remote = Address(f"93.184.{i // 254 % 254}.{i % 254 + 1}", 443)
+    return Connection(status, Address('10.0.0.5', 20000 + i % 40000), remote, 100 + i % 300)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', default='1000,10000')
+    parser.add_argument('--churn', type=int, default=20, help="connections opened and closed between polls")
+    args = parser.parse_args()
+
+    for count in [int(value) for value in args.connections.split(',')]:
+        connections = [connection(i) for i in range(count)]
+        table = FlowTable(fake_psutil([], connections), close_after=0)
+        table.poll()
+        times = []
+        for n in range(20):
+            del connections[:args.churn]
+            connections.extend(connection(count + n * args.churn + i) for i in range(args.churn))
+            start = time.perf_counter()
+            table.poll()
+            times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        hosts = table.by_remote()
+        grouping = time.perf_counter() - start
+        print(f"{count:>7,} connections: poll with {args.churn} opens/closes {statistics.median(times) * 1000:.2f} ms, "
+              f"by_remote {grouping * 1000:.2f} ms ({len(hosts):,} hosts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Journal write throughput and restart load time
+
+Usage: python benchmarks/bench_journal.py [--events N] [--segment-mb M]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_store import EventStore, to_epoch_us
+from journal import EventJournal
+from bench_store_memory import make_entries
+
+
+def rows_for(count):
+    for entry in make_entries(count):
+        extra = {key: value for key, value in entry.items()
+                 if key not in ('Time', 'Source', 'Type', 'Severity', 'Event', 'Details')}
+        yield (to_epoch_us(entry['Time']), entry['Source'], entry['Type'], entry['Severity'],
+               entry['Event'], entry['Details'], extra or None)
+
+
+def bench_write(directory, rows, segment_bytes):
+    journal = EventJournal(directory, segment_bytes=segment_bytes)
+    start = time.perf_counter()
+    for row in rows:
+        journal.append(*row)
+    journal.close()
+    elapsed = time.perf_counter() - start
+    return journal, elapsed
+
+
+def bench_restart(directory, since):
+    start = time.perf_counter()
+    journal = EventJournal(directory)
+    rows = journal.load(since=since)
+    store = EventStore()
+    store.extend_rows(rows)
+    elapsed = time.perf_counter() - start
+    journal.close()
+    return len(rows), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=200_000)
+    parser.add_argument('--segment-mb', type=float, default=8)
+    args = parser.parse_args()
+
+    rows = list(rows_for(args.events))
+    root = tempfile.mkdtemp(prefix='journal-bench-')
+    try:
+        directory = os.path.join(root, 'write')
+        journal, elapsed = bench_write(directory, rows, int(args.segment_mb * 1024 * 1024))
+        print(f"records:         {journal.records_written:,} in {len(journal.segments())} segments")
+        print(f"write:           {journal.records_written / elapsed:,.0f} records/s, "
+              f"{journal.bytes_written / elapsed / 1e6:.1f} MB/s")
+
+        loaded, elapsed = bench_restart(directory, since=None)
+        print(f"restart (all):   {loaded:,} rows in {elapsed:.2f}s")
+        recent_cutoff = rows[len(rows) * 3 // 4][0]
+        loaded, elapsed = bench_restart(directory, since=recent_cutoff)
+        print(f"restart (tail):  {loaded:,} rows in {elapsed:.2f}s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
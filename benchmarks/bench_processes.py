@@ -0,0 +1,78 @@
+"""Process tracker poll cost at several process counts
+
+Uses the real psutil when it is installed (--real) and the stub otherwise.
+
+Usage: python benchmarks/bench_processes.py [--processes 1000,5000] [--churn N] [--real]
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processes import ProcessTracker
+from testkit.stubs import FakeProcess, fake_psutil
+
+
+def fake_process(pid):
+    return FakeProcess({'pid': pid, 'name': f"proc{pid}.exe", 'username': 'SYSTEM',
+                        'create_time': datetime.datetime.now().timestamp()})
+
+
+def poll_ms(tracker, repeat=20):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tracker.poll()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', default='1000,5000,20000')
+    parser.add_argument('--churn', type=int, default=20, help="processes started and exited between polls")
+    parser.add_argument('--real', action='store_true', help="poll this machine's processes with psutil")
+    args = parser.parse_args()
+
+    if args.real:
+        import psutil
+        tracker = ProcessTracker(psutil)
+        start = time.perf_counter()
+        tracker.poll()
+        print(f"real baseline:   {len(tracker):,} processes in {(time.perf_counter() - start) * 1000:.1f} ms")
+        print(f"real poll:       {poll_ms(tracker):.2f} ms")
+        cheap = ProcessTracker(psutil, attrs=('name', 'create_time'))
+        cheap.poll()
+        print(f"real poll (no username): {poll_ms(cheap):.2f} ms")
+
+    for count in [int(value) for value in args.processes.split(',')]:
+        psutil = fake_psutil([fake_process(pid) for pid in range(count)], [])
+        tracker = ProcessTracker(psutil)
+        tracker.poll()
+        idle = poll_ms(tracker)
+        next_pid = count
+
+        def churn():
+            nonlocal next_pid
+            for pid in list(psutil.table)[:args.churn]:
+                del psutil.table[pid]
+            for _ in range(args.churn):
+                psutil.table[next_pid] = fake_process(next_pid)
+                next_pid += 1
+
+        times = []
+        for _ in range(20):
+            churn()
+            start = time.perf_counter()
+            tracker.poll()
+            times.append(time.perf_counter() - start)
+        print(f"{count:>7,} processes: idle poll {idle:.2f} ms, "
+              f"poll with {args.churn} starts/exits {statistics.median(times) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Rule engine throughput (events/s) with thousands of rules, against a rule-by-rule matcher
+
+Usage: python benchmarks/bench_rules.py [--rules 0,100,1000,5000] [--events N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rules import RuleEngine
+from testkit.reference import naive_match
+from testkit.synthetic import EventGenerator, synthetic_rules
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'rules.json')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rules', default='0,100,1000,5000')
+    parser.add_argument('--events', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    events = list(EventGenerator(args.seed).entries(args.events))
+    for count in [int(value) for value in args.rules.split(',')]:
+        specs = synthetic_rules(count, args.seed)
+        start = time.perf_counter()
+        engine = RuleEngine(specs)
+        compile_seconds = time.perf_counter() - start
+
+        batch = [dict(event) for event in events]
+        start = time.perf_counter()
+        matched = engine.apply(batch)
+        seconds = time.perf_counter() - start
+        print(f"{count:>6,} rules: {len(batch) / seconds:>10,.0f} events/s, {matched:,} matched, "
+              f"compiled in {compile_seconds * 1000:.0f} ms")
+
+        if count:
+            sample = events[:300]
+            start = time.perf_counter()
+            for log in sample:
+                naive_match(specs, log)
+            naive_seconds = time.perf_counter() - start
+            print(f"{'':>14}rule by rule: {len(sample) / naive_seconds:>10,.0f} events/s")
+
+    shipped = RuleEngine.load(RULES_FILE)
+    batch = [dict(event) for event in events]
+    start = time.perf_counter()
+    matched = shipped.apply(batch)
+    seconds = time.perf_counter() - start
+    print(f"rules.json ({len(shipped)} rules): {len(batch) / seconds:,.0f} events/s, {matched:,} matched")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare memory of the old list-of-dicts log layout against EventStore
+
+Usage: python benchmarks/bench_store_memory.py [--events N]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_store import EventStore
+
+
+def make_entries(count, seed=1):
+    """Build collector-shaped dicts with the repetition real sessions show"""
+    rng = random.Random(seed)
+    start = datetime.datetime.now() - datetime.timedelta(hours=12)
+    names = [f"proc{i}.exe" for i in range(300)]
+    files = [f"C:\\Users\\me\\Documents\\report_{i}.docx" for i in range(2000)]
+    for i in range(count):
+        when = start + datetime.timedelta(seconds=i * 0.05)
+        kind = rng.random()
+        if kind < 0.5:
+            path = rng.choice(files)
+            action = rng.choice(['created', 'modified', 'deleted'])
+            yield {
+                'Time': when,
+                'Source': 'File System',
+                'Type': f'File {action.title()}',
+                'Event': f"File {action}: {os.path.basename(path)}",
+                'Details': f"Path: {path}",
+                'Severity': 'Medium' if action == 'deleted' else 'Low',
+                'EventType': action,
+                'FilePath': path
+            }
+        elif kind < 0.85:
+            name = rng.choice(names)
+            pid = rng.randint(100, 60000)
+            yield {
+                'Time': when,
+                'Source': 'Process',
+                'Type': 'Running Process',
+                'Event': f"Process: {name} (PID: {pid})",
+                'Details': f"User: SYSTEM\nPID: {pid}\nName: {name}",
+                'Severity': 'Low'
+            }
+        else:
+            port = rng.randint(1024, 65535)
+            yield {
+                'Time': when,
+                'Source': 'Network',
+                'Type': 'Network Connection',
+                'Event': f"Connection: 10.0.0.5:{port} -> 93.184.216.34:443",
+                'Details': f"Status: ESTABLISHED\nPID: {rng.randint(100, 60000)}",
+                'Severity': 'Medium'
+            }
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=200_000)
+    args = parser.parse_args()
+
+    dicts, dict_bytes = measure(lambda: list(make_entries(args.events)))
+    del dicts
+
+    def build_store():
+        store = EventStore()
+        store.extend(make_entries(args.events))
+        return store
+
+    store, store_bytes = measure(build_store)
+
+    print(f"events:          {args.events:,}")
+    print(f"list of dicts:   {dict_bytes / 1e6:8.1f} MB ({dict_bytes / args.events:6.0f} B/event)")
+    print(f"EventStore:      {store_bytes / 1e6:8.1f} MB ({store_bytes / args.events:6.0f} B/event)")
+    print(f"ratio:           {dict_bytes / store_bytes:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Benchmark suite: ingest, search, filters, render and memory at several store sizes
+
+Runs on any platform: events come from the seeded synthetic generator and
+the Windows APIs are replaced by the stubs. Results are written as JSON;
+pass --compare with an earlier file to print the change per metric.
+
+Usage: python benchmarks/run.py [--sizes 10000,100000,1000000] [--out FILE] [--compare FILE]
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service import MonitorService
+from viewport import viewport_rows
+from testkit.synthetic import EventGenerator
+from testkit.stubs import install_platform_stubs, stub_sources
+
+SEARCH_QUERIES = ['report_1', 'proc12', 'delete', 'ab', '4625']
+TYPE_CHOICES = ['All', 'File', 'Process', 'Network', 'Event', 'System']
+TIME_CHOICES = ['Live (1 min)', 'Last 5 min', 'Last 15 min', 'Last hour', 'Today', 'All']
+VIEWPORT_ROWS = 60
+LIVE_EVENTS_MAX = 200_000
+
+
+def timed(func, repeat=1):
+    """Run func repeat times and return (median seconds, last result)"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def new_service(journal_dir, sources=None):
+    return MonitorService(journal_dir=journal_dir, sources=sources or [], max_events=None)
+
+
+def bench_size(size, seed, journal_dir):
+    generator = EventGenerator(seed)
+    results = {}
+
+    # Memory per event (store + search index), measured on its own build
+    gc.collect()
+    tracemalloc.start()
+    measured = new_service(journal_dir)
+    measured.store.extend(EventGenerator(seed).entries(size))
+    measured.search_index.update()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results['memory_bytes_per_event'] = round(current / size, 1)
+    del measured
+    gc.collect()
+
+    # Bulk ingest (collector results) and indexing
+    svc = new_service(journal_dir)
+    entries = list(generator.entries(size))
+    seconds, _ = timed(lambda: svc.store.extend(entries))
+    results['bulk_ingest_events_per_s'] = round(size / seconds)
+    seconds, _ = timed(svc.search_index.update)
+    results['index_events_per_s'] = round(size / seconds)
+    del entries
+
+    # Live file events: log_file_event -> bounded queue -> drain_file_events, as the UI tick does
+    live = min(size, LIVE_EVENTS_MAX)
+    raw = list(generator.file_events(live))
+    chunk = svc.file_events_queue.maxsize // 2
+
+    def live_ingest():
+        stored = 0
+        for start in range(0, live, chunk):
+            for event_type, src, dest in raw[start:start + chunk]:
+                svc.log_file_event(event_type, src, dest)
+            while svc.file_events_queue.qsize():
+                stored += len(svc.drain_file_events())
+        return stored
+
+    seconds, stored = timed(live_ingest)
+    results['live_ingest_events_per_s'] = round(live / seconds)
+    results['live_ingest_dropped'] = svc.file_events_queue.dropped
+    results['live_ingest_stored'] = stored
+
+    # Search box: cold query, then the same query again, then typing one more character
+    search = {}
+    for query in SEARCH_QUERIES:
+        svc.search_index._last_query = None
+        cold, ids = timed(lambda: svc.search_ids(query))
+        again, _ = timed(lambda: svc.search_ids(query))
+        refine, _ = timed(lambda: svc.search_ids(query + '2'))
+        search[query] = {'cold_ms': ms(cold), 'repeat_ms': ms(again), 'refine_ms': ms(refine), 'hits': len(ids)}
+    results['search'] = search
+
+    results['type_filter_ms'] = {choice: ms(timed(lambda: svc.type_filter_ids(choice), repeat=3)[0])
+                                 for choice in TYPE_CHOICES}
+    results['time_filter_ms'] = {choice: ms(timed(lambda: svc.time_filter_ids(choice), repeat=3)[0])
+                                 for choice in TIME_CHOICES}
+
+    # display_logs: order the ids, then format one viewport at the top, middle and bottom
+    store = svc.store
+    order, ids = timed(lambda: store.in_time_order(store.ids()))
+    render = {'order_ms': ms(order)}
+    for label, top in (('top', 0), ('middle', len(ids) // 2), ('bottom', max(0, len(ids) - VIEWPORT_ROWS))):
+        seconds, _ = timed(lambda: viewport_rows(store, ids, top, VIEWPORT_ROWS), repeat=5)
+        render[f"{label}_ms"] = ms(seconds)
+    results['render'] = render
+
+    svc.close()
+    return results
+
+
+def bench_collectors(seed, journal_dir):
+    """Full load through the real collector code over the platform stubs, and through stub collectors"""
+    install_platform_stubs(seed)
+    results = {}
+    for label, sources in (('platform_stubs', None), ('stub_sources', stub_sources(EventGenerator(seed)))):
+        svc = MonitorService(journal_dir=journal_dir, sources=sources, max_events=None)
+        seconds, _ = timed(svc.load_all_logs)
+        results[label] = {'seconds': round(seconds, 3), 'events': len(svc.store),
+                          'collectors': {name: round(timing.get('seconds') or 0, 4)
+                                         for name, timing in svc.collector_runner.timings.items()}}
+        svc.close()
+    return results
+
+
+def flatten(results, prefix=''):
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten(value, name + '.')
+        elif isinstance(value, (int, float)):
+            yield name, value
+
+
+def compare(current, previous_path):
+    with open(previous_path, encoding='utf-8') as f:
+        previous = dict(flatten(json.load(f)['results']))
+    print(f"\nChange against {previous_path}:")
+    for name, value in flatten(current['results']):
+        before = previous.get(name)
+        if before:
+            print(f"  {name:<60} {before:>14,.3f} -> {value:>14,.3f}  ({value / before:6.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', default=None, help="JSON results file (default: benchmarks/results/<time>.json)")
+    parser.add_argument('--compare', default=None, help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    report = {
+        'meta': {
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+        },
+        'results': {},
+    }
+
+    with tempfile.TemporaryDirectory() as journal_dir:
+        for size in sizes:
+            print(f"{size:,} events...", flush=True)
+            report['results'][str(size)] = bench_size(size, args.seed, journal_dir)
+            print(json.dumps(report['results'][str(size)], indent=2), flush=True)
+        report['results']['collectors'] = bench_collectors(args.seed, journal_dir)
+        print(json.dumps(report['results']['collectors'], indent=2))
+
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results',
+                                   datetime.datetime.now().strftime('%Y%m%d-%H%M%S.json'))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
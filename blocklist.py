@@ -0,0 +1,127 @@
+"""Blocklist of normalized event signatures, checked against every event at ingest"""
+import json
+import os
+import re
+import threading
+import time
+from ingest import normalize_path
+from rules import EVENT_ID, PATH_LINE, SEVERITY_RANK
+
+PROCESS_LINE = re.compile(r'^(?:Process|Name): (.+)$', re.MULTILINE)
+REMOTE_ENDPOINT = re.compile(r'-> (\S+):(\d+|N/A)$')
+HOME = normalize_path(os.path.expanduser('~'))
+ACTIONS = ('flag', 'suppress')
+
+
+def signatures(log):
+    """Normalized signatures of an event, most specific first
+
+    path:<file path, lowercase with / separators and the home folder as ~>
+    remote:<ip>:<port>, process:<lowercase image name>, event:<Windows event ID>
+    """
+    found = []
+    details = log.get('Details', '')
+    path = log.get('FilePath')
+    if not path and 'Path: ' in details:
+        path = PATH_LINE.search(details)
+        path = path.group(1) if path else None
+    if path:
+        path = normalize_path(path)
+        if path.startswith(HOME + '/'):
+            path = '~' + path[len(HOME):]
+        found.append(f"path:{path}")
+
+    event = log.get('Event', '')
+    source = log.get('Source')
+    if source == 'Network':
+        endpoint = REMOTE_ENDPOINT.search(event)
+        if endpoint:
+            found.append(f"remote:{endpoint.group(1)}:{endpoint.group(2)}")
+    if source in ('Process', 'Network'):
+        name = PROCESS_LINE.search(details)
+        if name:
+            found.append(f"process:{name.group(1).strip().lower()}")
+
+    event_id = EVENT_ID.search(event) or EVENT_ID.search(details)
+    if event_id:
+        found.append(f"event:{event_id.group(1)}")
+    return found
+
+
+class Blocklist:
+    """Signatures mapped to an action, persisted as JSON and looked up by hash
+
+    'flag' marks matching events as threats (Severity raised to High,
+    'Blocked' set to the signature); 'suppress' drops them before they
+    are stored. Checking an event costs one dict lookup per signature,
+    however many entries there are.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}  # signature -> {'action', 'added', 'note'}
+        self.flagged = 0
+        self.suppressed = 0
+        if path:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, signature):
+        return signature in self.entries
+
+    def add(self, signature, action='flag', note=''):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown blocklist action: {action}")
+        with self.lock:
+            self.entries = {**self.entries, signature: {'action': action, 'added': time.time(), 'note': note}}
+            self.save()
+
+    def remove(self, signature):
+        with self.lock:
+            if signature in self.entries:
+                self.entries = {key: value for key, value in self.entries.items() if key != signature}
+                self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(temp_path, self.path)
+
+    def check(self, log):
+        """(signature, action) of the first blocklisted signature of log, or None"""
+        entries = self.entries
+        for signature in signatures(log):
+            entry = entries.get(signature)
+            if entry is not None:
+                return signature, entry['action']
+        return None
+
+    def apply(self, logs):
+        """Flag matching entries in place and return the list without the suppressed ones"""
+        if not self.entries:
+            return logs
+        kept = []
+        for log in logs:
+            hit = self.check(log)
+            if hit is None:
+                kept.append(log)
+            elif hit[1] == 'suppress':
+                self.suppressed += 1
+            else:
+                log['Blocked'] = hit[0]
+                if SEVERITY_RANK.get(log.get('Severity'), 0) < SEVERITY_RANK['High']:
+                    log['Severity'] = 'High'
+                self.flagged += 1
+                kept.append(log)
+        return kept
@@ -0,0 +1,318 @@
+"""Concurrent execution of log collectors"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class CollectorRunner:
+    """Run collectors on a worker pool, each under its own timeout
+
+    Collectors are callables taking a cancel event (threading.Event) and
+    returning a list of log entries. Results are handed to on_result as soon
+    as each collector finishes, so one slow source never holds back the
+    rest. A collector's timeout starts when it begins running, not while it
+    waits for a worker. A collector that overruns its timeout is abandoned:
+    its own cancel event is set so it can stop and free its worker,
+    anything it returns later is discarded, and it is recorded as timed out.
+    One that never gets a worker within max_queue_wait seconds (by default
+    the longest timeout in the run, by when every cooperative collector has
+    let go of its worker) is dropped the same way.
+    """
+
+    def __init__(self, max_workers=8, default_timeout=30.0, max_queue_wait=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='collector')
+        self.default_timeout = default_timeout
+        self.max_queue_wait = max_queue_wait
+        self.timings = {}  # name -> {'seconds', 'status', 'count'}
+        self.lock = threading.Lock()
+
+    def _call(self, name, func, cancel, starts):
+        with self.lock:
+            starts[name] = time.monotonic()
+        start = time.perf_counter()
+        try:
+            return func(cancel)
+        finally:
+            with self.lock:
+                timing = self.timings.setdefault(name, {})
+                timing['seconds'] = time.perf_counter() - start
+
+    def run(self, collectors, on_result, on_error=None):
+        """Run (name, func, timeout) collectors and block until each has finished or timed out"""
+        submitted = time.monotonic()
+        starts = {}  # name -> when its worker picked it up
+        pending = {}  # future -> (name, timeout, cancel event)
+        for name, func, timeout in collectors:
+            with self.lock:
+                self.timings[name] = {'seconds': None, 'status': 'running', 'count': 0}
+            cancel = threading.Event()
+            future = self.executor.submit(self._call, name, func, cancel, starts)
+            pending[future] = (name, timeout or self.default_timeout, cancel)
+        submitted_count = len(pending)
+        queue_wait = self.max_queue_wait
+        if queue_wait is None:
+            queue_wait = max((timeout for _, timeout, _ in pending.values()), default=self.default_timeout)
+
+        def deadline(name, timeout):
+            start = starts.get(name)
+            return (start, start + timeout) if start is not None else (None, submitted + queue_wait)
+
+        try:
+            while pending:
+                with self.lock:
+                    deadlines = {future: deadline(name, timeout) for future, (name, timeout, _) in pending.items()}
+                    queued = len(starts) < submitted_count
+                next_deadline = min(end for _, end in deadlines.values())
+                # While some are still queued, wake up now and then to start their clocks
+                wake = min(next_deadline, time.monotonic() + 0.05) if queued else next_deadline
+                done, _ = wait(pending, timeout=max(0.0, wake - time.monotonic()), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name, _, _ = pending.pop(future)
+                    try:
+                        logs = future.result()
+                    except Exception as e:
+                        self._finish(name, 'error', 0)
+                        if on_error:
+                            on_error(name, e)
+                        continue
+                    self._finish(name, 'ok', len(logs))
+                    on_result(name, logs)
+
+                now = time.monotonic()
+                for future, (name, timeout, cancel) in list(pending.items()):
+                    with self.lock:
+                        start, end = deadline(name, timeout)
+                    if now < end or future.done():
+                        continue
+                    # Stragglers see their flag and can stop early; their results are dropped
+                    cancel.set()
+                    future.cancel()
+                    del pending[future]
+                    if start is None:
+                        self._finish(name, 'timeout', 0, seconds=0.0)
+                        error = TimeoutError(f"{name} did not start within {now - submitted:.1f}s")
+                    else:
+                        self._finish(name, 'timeout', 0, seconds=now - start)
+                        error = TimeoutError(f"{name} timed out after {now - start:.1f}s")
+                    if on_error:
+                        on_error(name, error)
+        finally:
+            for _, _, cancel in pending.values():
+                cancel.set()
+
+    def _finish(self, name, status, count, seconds=None):
+        with self.lock:
+            timing = self.timings.setdefault(name, {})
+            timing['status'] = status
+            timing['count'] = count
+            if seconds is not None:
+                timing['seconds'] = seconds
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fingerprint(log):
+    """Identity of an entry across refreshes (its Time may be 'now' on every run)"""
+    return hash((log.get('Source'), log.get('Type'), log.get('Event'), log.get('Details')))
+
+
+class CollectorCheckpoints:
+    """Remember what each collector returned last time so refreshes only ingest changes
+
+    since(name) is the start time (epoch seconds) of the collector's last
+    successful run, for collectors that can skip older records. changes()
+    drops entries whose fingerprint was in the previous run's output, so
+    snapshot collectors (processes, connections, startup entries) only
+    yield what is new. Memory stays proportional to one snapshot.
+    """
+
+    def __init__(self, overlap=1.0):
+        self.overlap = overlap
+        self.started = {}
+        self.completed = {}  # name -> start time of the last successful run
+        self.seen = {}  # name -> fingerprints of the last successful run
+        self.restored = set()  # Fingerprints of events reloaded from the journal
+
+    def since(self, name):
+        completed = self.completed.get(name)
+        return None if completed is None else completed - self.overlap
+
+    def begin(self, name):
+        self.started[name] = time.time()
+
+    def seed(self, logs):
+        """Treat reloaded events as already seen by each collector's first run"""
+        self.restored.update(fingerprint(log) for log in logs)
+
+    def changes(self, name, logs):
+        """Return the entries not seen in the previous run and move the checkpoint forward"""
+        previous = self.seen.get(name, self.restored)
+        current = set()
+        fresh = []
+        for log in logs:
+            key = fingerprint(log)
+            current.add(key)
+            if key not in previous:
+                fresh.append(log)
+        self.seen[name] = current
+        self.completed[name] = self.started.get(name, time.time())
+        return fresh
+
+    def advance(self, name):
+        """Move the checkpoint forward for a collector that tracks its own position"""
+        self.seen.pop(name, None)
+        self.completed[name] = self.started.get(name, time.time())
+
+
+class BookmarkStore:
+    """Small JSON file of per-reader bookmarks, saved atomically (in memory only without a path)"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.values = {}
+        if path:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.values = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+    def get(self, key):
+        with self.lock:
+            return self.values.get(key)
+
+    def set(self, key, value):
+        with self.lock:
+            self.values[key] = value
+            if not self.path:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.values, f)
+            os.replace(temp_path, self.path)
+
+
+class Win32EventLogSource:
+    """Windows event log behind the interface EventLogReader reads through
+
+    open(), bounds() giving the (oldest, newest) RecordNumber or
+    (None, None) for an empty log, pages(start) yielding lists of records
+    (each with RecordNumber, TimeGenerated, EventID, EventType) newest first
+    when start is None, else oldest first from RecordNumber start,
+    message(record) and close(). Any object with these methods can stand
+    in for it.
+    """
+
+    def __init__(self, log_type='Security', server=None):
+        self.log_type = log_type
+        self.server = server
+        self.handle = None
+
+    def open(self):
+        import win32evtlog
+        self.handle = win32evtlog.OpenEventLog(self.server, self.log_type)
+
+    def bounds(self):
+        import win32evtlog
+        count = win32evtlog.GetNumberOfEventLogRecords(self.handle)
+        if not count:
+            return None, None
+        oldest = win32evtlog.GetOldestEventLogRecord(self.handle)
+        return oldest, oldest + count - 1
+
+    def pages(self, start=None):
+        import win32evtlog
+        if start is None:
+            flags, offset = win32evtlog.EVENTLOG_BACKWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ, 0
+        else:
+            flags, offset = win32evtlog.EVENTLOG_FORWARDS_READ | win32evtlog.EVENTLOG_SEEK_READ, start
+        while True:
+            page = win32evtlog.ReadEventLog(self.handle, flags, offset)
+            if not page:
+                return
+            yield page
+            if start is not None:
+                # Carry on sequentially from where the seek left off
+                flags, offset = win32evtlog.EVENTLOG_FORWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ, 0
+
+    def message(self, record):
+        import win32evtlogutil
+        return win32evtlogutil.SafeFormatMessage(record, self.log_type)
+
+    def close(self):
+        if self.handle is not None:
+            import win32evtlog
+            win32evtlog.CloseEventLog(self.handle)
+            self.handle = None
+
+
+class EventLogReader:
+    """Read an event log forwards from the last record ingested, a bounded batch at a time
+
+    The bookmark is the RecordNumber of the newest record handled by a
+    committed read. Without one (first run, or the log was cleared and
+    renumbered) only the newest backfill records are read. A read returns
+    at most max_records records, oldest first, so a long backlog after
+    downtime is worked through over several refreshes. The caller marks
+    each record once it has handled it; commit() persists the last mark
+    once the records are safely stored, so a batch that is only partly
+    handled still moves the bookmark that far, and one whose results are
+    dropped is simply read again next time.
+    """
+
+    def __init__(self, source, bookmarks, key, backfill=500, max_records=2_000):
+        self.source = source
+        self.bookmarks = bookmarks
+        self.key = key
+        self.backfill = backfill
+        self.max_records = max_records
+        self.pending = None
+        self.pages_read = 0
+
+    def read(self, cancel=None):
+        """Return up to max_records records newer than the bookmark, oldest first"""
+        bookmark = self.bookmarks.get(self.key)
+        self.pending = None
+        records = []
+        self.source.open()
+        try:
+            oldest, newest = self.source.bounds()
+            if newest is None or bookmark == newest:
+                return records
+            if bookmark is None or bookmark > newest:
+                # No bookmark, or the numbers went backwards because the log was cleared:
+                # take the newest backfill records
+                for page in self.source.pages():
+                    self.pages_read += 1
+                    records.extend(page[:self.backfill - len(records)])
+                    if len(records) >= self.backfill or (cancel is not None and cancel.is_set()):
+                        break
+                records.reverse()
+            else:
+                # Past the oldest record still in the log if it wrapped since the last read
+                for page in self.source.pages(max(bookmark + 1, oldest)):
+                    self.pages_read += 1
+                    records.extend(page[:self.max_records - len(records)])
+                    if len(records) >= self.max_records or (cancel is not None and cancel.is_set()):
+                        break
+        finally:
+            self.source.close()
+        return records
+
+    def mark(self, record):
+        """Note that record (and every record read before it) has been handled"""
+        self.pending = record.RecordNumber
+
+    def message(self, record):
+        return self.source.message(record)
+
+    def commit(self):
+        if self.pending is not None:
+            self.bookmarks.set(self.key, self.pending)
+            self.pending = None
@@ -0,0 +1,420 @@
+"""Columnar in-memory store for monitor events"""
+import datetime
+import heapq
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+
+# Fields every collector fills in. Anything else on an entry is kept as a sparse extra.
+CORE_FIELDS = ('Time', 'Source', 'Type', 'Event', 'Details', 'Severity')
+
+# Stored for events whose time could not be converted (shown as "N/A")
+NO_TIME = -(1 << 63)
+
+# in_time_order sorts a subset smaller than this fraction of the store by its
+# timestamps; larger ones are picked out of a walk over the time index
+SORT_SUBSET_FRACTION = 0.05
+
+
+def to_epoch_us(value):
+    """Convert datetime / pywintypes time / epoch seconds to int64 epoch microseconds"""
+    try:
+        if isinstance(value, (int, float)):
+            return int(value * 1_000_000)
+        if isinstance(value, datetime.datetime) or hasattr(value, 'timestamp'):
+            return int(value.timestamp() * 1_000_000)
+    except (OverflowError, OSError, ValueError):
+        pass
+    return NO_TIME
+
+
+def from_epoch_us(value):
+    """Convert epoch microseconds back to a local datetime (None if unknown)"""
+    if value == NO_TIME:
+        return None
+    try:
+        return datetime.datetime.fromtimestamp(value / 1_000_000)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+class Vocabulary:
+    """Map a small set of repeated strings (Source, Type, Severity) to integer codes"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            value = sys.intern(str(value))
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def lookup(self, value):
+        """Return the code for value without adding it (None if never seen)"""
+        return self.codes.get(value)
+
+    def match(self, spec):
+        """Return the set of codes selected by spec (a value, iterable of values or predicate)"""
+        if callable(spec):
+            return {code for code, value in enumerate(self.values) if spec(value)}
+        if isinstance(spec, str):
+            spec = (spec,)
+        return {self.codes[value] for value in spec if value in self.codes}
+
+    def __len__(self):
+        return len(self.values)
+
+
+class StringPool:
+    """Deduplicate repeated Event/Details strings without pinning them forever"""
+
+    def __init__(self, max_size=200_000):
+        self.max_size = max_size
+        self.strings = {}
+
+    def intern(self, value):
+        if not isinstance(value, str):
+            value = str(value)
+        pooled = self.strings.get(value)
+        if pooled is not None:
+            return pooled
+        if len(self.strings) >= self.max_size:
+            # Start over rather than grow without bound; only future dedupe is lost
+            self.strings.clear()
+        self.strings[value] = value
+        return value
+
+
+class TimeIndex:
+    """(time, id) pairs kept sorted for bisect range lookups
+
+    Live events arrive in time order and are appended to the sorted run in
+    O(1). Collector batches carrying older timestamps are parked in a pending
+    run and merged in one pass the next time the index is queried.
+    """
+
+    def __init__(self):
+        self.ts = array('q')
+        self.ids = array('q')
+        self.pending = []
+
+    def add(self, ts, event_id):
+        if not self.ts or ts >= self.ts[-1]:
+            self.ts.append(ts)
+            self.ids.append(event_id)
+        else:
+            self.pending.append((ts, event_id))
+
+    def _merge(self):
+        if not self.pending:
+            return
+        self.pending.sort()
+        merged = heapq.merge(zip(self.ts, self.ids), self.pending)
+        ts = array('q')
+        ids = array('q')
+        for event_ts, event_id in merged:
+            ts.append(event_ts)
+            ids.append(event_id)
+        self.ts, self.ids = ts, ids
+        self.pending = []
+
+    def drop_before(self, first_id):
+        """Forget ids below first_id (evicted from the store)"""
+        self._merge()
+        ts = array('q')
+        ids = array('q')
+        for event_ts, event_id in zip(self.ts, self.ids):
+            if event_id >= first_id:
+                ts.append(event_ts)
+                ids.append(event_id)
+        self.ts, self.ids = ts, ids
+
+    def range(self, start=None, end=None):
+        """Ids with start <= time <= end (epoch us), oldest first"""
+        self._merge()
+        lo = 0 if start is None else bisect_left(self.ts, start)
+        hi = len(self.ts) if end is None else bisect_right(self.ts, end)
+        return self.ids[lo:hi]
+
+    def __len__(self):
+        return len(self.ts) + len(self.pending)
+
+
+class EventStore:
+    """Array-backed event columns addressed by monotonically increasing event ids
+
+    Timestamps live in an int64 array, Source/Type/Severity as small-int codes,
+    Event/Details as pooled strings. Rare fields (FilePath, EventType, ...) are
+    kept in a sparse dict so ordinary events pay nothing for them.
+
+    With max_events set, the oldest tenth of the store is evicted whenever it
+    overflows. Counts per (Source, Type, Severity) are kept current on both
+    ingest and eviction so statistics never need a scan.
+    """
+
+    def __init__(self, max_events=None):
+        self.max_events = max_events
+        self.lock = threading.RLock()
+        self.sources = Vocabulary()
+        self.types = Vocabulary()
+        self.severities = Vocabulary()
+        self.pool = StringPool()
+        self.journal = None  # Optional EventJournal every new event is written to
+        self.extra_pool = {}  # Identical extras dicts are shared (treated as read-only)
+        self._reset(0)
+
+    def _reset(self, base_id):
+        self.base_id = base_id
+        self.ts = array('q')
+        self.source_codes = array('H')
+        self.type_codes = array('H')
+        self.severity_codes = array('H')
+        self.events = []
+        self.details = []
+        self.extra = {}
+        self.time_index = TimeIndex()
+        self.counts = Counter()  # (source code, type code, severity code) -> events
+
+    # ============ INGEST ============
+
+    def append(self, entry, record=True):
+        """Append one collector-style dict and return its event id"""
+        extra = {key: value for key, value in entry.items() if key not in CORE_FIELDS and key != 'Id'}
+        return self.append_row(to_epoch_us(entry.get('Time')), entry.get('Source', 'System'),
+                               entry.get('Type', 'Unknown'), entry.get('Severity', 'Info'),
+                               entry.get('Event', ''), entry.get('Details', ''), extra, record)
+
+    def append_row(self, ts, source, type_name, severity, event, details, extra=None, record=True):
+        """Append one event from its column values (ts in epoch us) and return its id
+
+        With record set, the event is also written to the attached journal.
+        """
+        with self.lock:
+            if self.max_events and len(self.ts) >= self.max_events:
+                self.evict(max(1, self.max_events // 10))
+
+            event_id = self.base_id + len(self.ts)
+            codes = (self.sources.code(source), self.types.code(type_name),
+                     self.severities.code(severity))
+            self.source_codes.append(codes[0])
+            self.type_codes.append(codes[1])
+            self.severity_codes.append(codes[2])
+            self.counts[codes] += 1
+            self.events.append(self.pool.intern(event))
+            self.details.append(self.pool.intern(details))
+
+            if extra:
+                extra = {key: self.pool.intern(value) if isinstance(value, str) else value
+                         for key, value in extra.items()}
+                self.extra[event_id] = self._shared_extra(extra)
+
+            if record and self.journal is not None:
+                self.journal.append(ts, source, type_name, severity, event, details, extra)
+
+            # Timestamp goes last: a row only counts once every column has it
+            self.ts.append(ts)
+            self.time_index.add(ts, event_id)
+            return event_id
+
+    def extend(self, entries, record=True):
+        """Append many entries and return the range of ids they were given"""
+        with self.lock:
+            first = self.next_id
+            for entry in entries:
+                self.append(entry, record)
+            return range(first, self.next_id)
+
+    def extend_rows(self, rows, record=False):
+        """Append (ts, source, type, severity, event, details, extra) rows, e.g. from the journal"""
+        with self.lock:
+            first = self.next_id
+            for row in rows:
+                self.append_row(*row, record=record)
+            return range(first, self.next_id)
+
+    def _shared_extra(self, extra):
+        try:
+            key = tuple(extra.items())
+            shared = self.extra_pool.get(key)
+        except TypeError:  # Unhashable value, keep a private copy
+            return extra
+        if shared is None:
+            if len(self.extra_pool) >= self.pool.max_size:
+                self.extra_pool.clear()
+            shared = self.extra_pool[key] = extra
+        return shared
+
+    def evict(self, count):
+        """Drop the count oldest-ingested events"""
+        with self.lock:
+            count = min(count, len(self.ts))
+            if not count:
+                return
+            counts = self.counts
+            for row in range(count):
+                key = (self.source_codes[row], self.type_codes[row], self.severity_codes[row])
+                counts[key] -= 1
+                if not counts[key]:
+                    del counts[key]
+            for column in (self.ts, self.source_codes, self.type_codes, self.severity_codes,
+                           self.events, self.details):
+                del column[:count]
+            self.base_id += count
+            self.extra = {event_id: extra for event_id, extra in self.extra.items()
+                          if event_id >= self.base_id}
+            self.time_index.drop_before(self.base_id)
+
+    def clear(self):
+        """Drop every event. Ids keep increasing so old ids never get reused."""
+        with self.lock:
+            self._reset(self.next_id)
+
+    def set_extra(self, event_id, key, value):
+        """Attach a sparse field to an existing event"""
+        with self.lock:
+            if event_id in self:
+                # Copy on write: the current dict may be shared with other events
+                self.extra[event_id] = {**self.extra.get(event_id, {}), key: value}
+
+    # ============ ACCESS ============
+
+    @property
+    def next_id(self):
+        return self.base_id + len(self.ts)
+
+    def __len__(self):
+        return len(self.ts)
+
+    def __contains__(self, event_id):
+        return self.base_id <= event_id < self.next_id
+
+    def ids(self):
+        """All live ids, oldest ingested first"""
+        return range(self.base_id, self.next_id)
+
+    def get(self, event_id):
+        """Materialize one event as the familiar dict (None if unknown or evicted)"""
+        with self.lock:
+            if event_id not in self:
+                return None
+            row = event_id - self.base_id
+            log = {
+                'Id': event_id,
+                'Time': from_epoch_us(self.ts[row]),
+                'Source': self.sources.values[self.source_codes[row]],
+                'Type': self.types.values[self.type_codes[row]],
+                'Event': self.events[row],
+                'Details': self.details[row],
+                'Severity': self.severities.values[self.severity_codes[row]],
+            }
+            extra = self.extra.get(event_id)
+            if extra:
+                log.update(extra)
+            return log
+
+    def memory_estimate(self, sample=1000):
+        """Approximate bytes held by the columns, sampling rows for string sizes"""
+        with self.lock:
+            rows = len(self.ts)
+            total = sum(len(column) * column.itemsize
+                        for column in (self.ts, self.source_codes, self.type_codes, self.severity_codes))
+            total += sys.getsizeof(self.events) + sys.getsizeof(self.details) + sys.getsizeof(self.extra)
+            total += len(self.time_index) * 16
+            if rows:
+                step = max(1, rows // sample)
+                sampled = [column[row] for row in range(0, rows, step) for column in (self.events, self.details)]
+                # Pooled strings are shared, so only count the distinct share of the sample
+                distinct = {id(value): value for value in sampled}
+                average = sum(sys.getsizeof(value) for value in distinct.values()) / len(sampled)
+                total += int(average * rows * 2)
+            return total
+
+    def time_of(self, event_id):
+        return self.ts[event_id - self.base_id]
+
+    def count(self, sources=None, types=None, severities=None):
+        """Number of events matching the column filters, answered from the counters"""
+        with self.lock:
+            wanted = [None if spec is None else vocab.match(spec)
+                      for spec, vocab in ((sources, self.sources), (types, self.types),
+                                          (severities, self.severities))]
+            return sum(n for key, n in self.counts.items()
+                       if all(codes is None or code in codes for code, codes in zip(key, wanted)))
+
+    def count_by(self, column):
+        """Counts per value of 'Source', 'Type' or 'Severity'"""
+        position, vocab = {'Source': (0, self.sources), 'Type': (1, self.types),
+                           'Severity': (2, self.severities)}[column]
+        with self.lock:
+            totals = Counter()
+            for key, n in self.counts.items():
+                totals[vocab.values[key[position]]] += n
+            return dict(totals)
+
+    def find_extra(self, key, value):
+        """Return the id of an event whose extra field key equals value (None if absent)"""
+        with self.lock:
+            for event_id, extra in self.extra.items():
+                if extra.get(key) == value:
+                    return event_id
+        return None
+
+    def ids_with_extra(self, key, value):
+        """Ids of every event whose extra field key equals value, oldest first"""
+        with self.lock:
+            return sorted(event_id for event_id, extra in self.extra.items() if extra.get(key) == value)
+
+    def select(self, sources=None, types=None, severities=None, where=None):
+        """Return ids (oldest first) matching the coded column filters
+
+        Each filter is a value, iterable of values or predicate on the value.
+        where(type_name, event, details) further narrows the rows it is given.
+        """
+        with self.lock:
+            columns = []
+            for spec, vocab, codes in ((sources, self.sources, self.source_codes),
+                                       (types, self.types, self.type_codes),
+                                       (severities, self.severities, self.severity_codes)):
+                if spec is not None:
+                    wanted = vocab.match(spec)
+                    if not wanted:
+                        return []
+                    columns.append((wanted, codes))
+
+            base = self.base_id
+            type_names = self.types.values
+            result = []
+            for row in range(len(self.ts)):
+                if all(column[row] in wanted for wanted, column in columns):
+                    if where is None or where(type_names[self.type_codes[row]],
+                                              self.events[row], self.details[row]):
+                        result.append(base + row)
+            return result
+
+    def time_range(self, since=None, until=None):
+        """Ids of events with a known time in [since, until], oldest first"""
+        with self.lock:
+            start = NO_TIME + 1 if since is None else max(to_epoch_us(since), NO_TIME + 1)
+            end = None if until is None else to_epoch_us(until)
+            return self.time_index.range(start, end)
+
+    def in_time_order(self, ids):
+        """Order a subset of ids by event time (then id), oldest first"""
+        with self.lock:
+            if isinstance(ids, range) and ids == self.ids():
+                return self.time_index.range()
+            if len(ids) < len(self.ts) * SORT_SUBSET_FRACTION:
+                ts, base, end = self.ts, self.base_id, self.next_id
+                live = [event_id for event_id in ids if base <= event_id < end]
+                live.sort(key=lambda event_id: (ts[event_id - base], event_id))
+                return array('q', live)
+            wanted = ids if isinstance(ids, (set, frozenset)) else set(ids)
+            return array('q', (event_id for event_id in self.time_index.range() if event_id in wanted))
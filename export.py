@@ -0,0 +1,147 @@
+"""Streaming export of stored events to text, CSV and JSON Lines"""
+import csv
+import datetime
+import gzip
+import json
+import os
+import threading
+
+
+# Extension -> format; a trailing .gz compresses any of them
+FORMATS = {'.txt': 'txt', '.log': 'txt', '.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl'}
+
+CSV_COLUMNS = ('Id', 'Time', 'Source', 'Type', 'Severity', 'Event', 'Details', 'Extra')
+CORE_COLUMNS = ('Id', 'Time', 'Source', 'Type', 'Event', 'Details', 'Severity')
+
+
+def format_for(path):
+    """Return (format, compressed) chosen by the file extension"""
+    root, ext = os.path.splitext(path.lower())
+    compressed = ext == '.gz'
+    if compressed:
+        ext = os.path.splitext(root)[1]
+    return FORMATS.get(ext, 'txt'), compressed
+
+
+def time_text(value, iso=False):
+    if not isinstance(value, datetime.datetime):
+        return "" if iso else "N/A"
+    return value.isoformat() if iso else value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class TextWriter:
+    def __init__(self, f):
+        self.f = f
+        f.write("System Logs Export\n")
+        f.write("=" * 50 + "\n\n")
+
+    def write(self, log):
+        self.f.write(f"Time: {time_text(log['Time'])}\n"
+                     f"Source: {log['Source']}\n"
+                     f"Type: {log['Type']}\n"
+                     f"Event: {log['Event']}\n"
+                     f"Details: {log['Details']}\n"
+                     f"Severity: {log['Severity']}\n"
+                     + "-" * 40 + "\n\n")
+
+
+class CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.writer(f)
+        self.writer.writerow(CSV_COLUMNS)
+
+    def write(self, log):
+        extra = {key: value for key, value in log.items() if key not in CORE_COLUMNS}
+        self.writer.writerow((log['Id'], time_text(log['Time'], iso=True), log['Source'], log['Type'],
+                              log['Severity'], log['Event'], log['Details'],
+                              json.dumps(extra, default=str) if extra else ''))
+
+
+class JsonLinesWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, log):
+        log = dict(log, Time=time_text(log['Time'], iso=True) or None)
+        self.f.write(json.dumps(log, default=str, ensure_ascii=False))
+        self.f.write("\n")
+
+
+WRITERS = {'txt': TextWriter, 'csv': CsvWriter, 'jsonl': JsonLinesWriter}
+
+
+class EventExporter:
+    """Write a list of event ids to a file on a background thread
+
+    Events are materialized chunk_size at a time, holding the store lock
+    only while a chunk is read, so memory stays flat however much is
+    exported and ingestion carries on meanwhile. Output goes to a
+    temporary file renamed into place on success; a cancelled or failed
+    export leaves nothing behind. done/total can be polled for progress.
+    """
+
+    def __init__(self, store, ids, path, chunk_size=2000):
+        self.store = store
+        self.ids = ids
+        self.path = path
+        self.chunk_size = chunk_size
+        self.format, self.compressed = format_for(path)
+        self.total = len(ids)
+        self.done = 0
+        self.written = 0  # Ids evicted before they were reached are skipped
+        self.status = 'pending'  # pending, running, ok, cancelled, error
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def start(self, on_finished=None):
+        """Run the export in a daemon thread; on_finished(exporter) is called from it at the end"""
+        def run():
+            self.run()
+            if on_finished:
+                on_finished(self)
+
+        self.thread = threading.Thread(target=run, name='export', daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        self.status = 'running'
+        temp_path = self.path + '.part'
+        try:
+            if self.compressed:
+                f = gzip.open(temp_path, 'wt', encoding='utf-8', newline='')
+            else:
+                f = open(temp_path, 'w', encoding='utf-8', newline='')
+            with f:
+                writer = WRITERS[self.format](f)
+                for start in range(0, self.total, self.chunk_size):
+                    if self.cancel_event.is_set():
+                        break
+                    with self.store.lock:
+                        chunk = [self.store.get(event_id) for event_id in self.ids[start:start + self.chunk_size]]
+                    for log in chunk:
+                        if log is not None:
+                            writer.write(log)
+                            self.written += 1
+                    self.done = min(self.total, start + self.chunk_size)
+
+            if self.cancel_event.is_set():
+                os.remove(temp_path)
+                self.status = 'cancelled'
+            else:
+                os.replace(temp_path, self.path)
+                self.status = 'ok'
+        except Exception as e:
+            self.error = e
+            self.status = 'error'
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 1.0
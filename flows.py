@@ -0,0 +1,98 @@
+"""Flow table: network connections with first/last seen times, opened and closed"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class Flow:
+    __slots__ = ('laddr', 'raddr', 'pid', 'status', 'first_seen', 'last_seen')
+
+    def __init__(self, laddr, raddr, pid, status, now):
+        self.laddr = laddr
+        self.raddr = raddr
+        self.pid = pid
+        self.status = status
+        self.first_seen = now
+        self.last_seen = now
+
+
+class FlowTable:
+    """Connections keyed by (laddr, raddr, pid), diffed poll to poll
+
+    A flow opens the first poll it is seen in and closes once it has gone
+    unseen for close_after seconds, so a connection missing from a single
+    listing doesn't flap. Beyond max_flows the least recently seen flows
+    are closed early, keeping memory bounded. The first poll is a baseline
+    and reports nothing.
+    """
+
+    def __init__(self, psutil, close_after=10.0, max_flows=10_000, statuses=('ESTABLISHED',)):
+        self.psutil = psutil
+        self.close_after = close_after
+        self.max_flows = max_flows
+        self.statuses = set(statuses)
+        self.flows = OrderedDict()  # (laddr, raddr, pid) -> Flow, least recently seen first
+        self.lock = threading.Lock()
+        self.polls = 0
+        self.evicted = 0
+
+    def poll(self, now=None):
+        """Return (opened, closed) flows since the previous poll"""
+        now = time.time() if now is None else now
+        opened = []
+        closed = []
+        with self.lock:
+            flows = self.flows
+            for conn in self.psutil.net_connections(kind='inet'):
+                if conn.status not in self.statuses or not conn.raddr:
+                    continue
+                laddr = (conn.laddr.ip, conn.laddr.port)
+                raddr = (conn.raddr.ip, conn.raddr.port)
+                key = (laddr, raddr, conn.pid)
+                flow = flows.get(key)
+                if flow is None:
+                    flow = flows[key] = Flow(laddr, raddr, conn.pid, conn.status, now)
+                    opened.append(flow)
+                else:
+                    flow.last_seen = now
+                    flow.status = conn.status
+                    flows.move_to_end(key)
+
+            cutoff = now - self.close_after
+            while flows:
+                key, flow = next(iter(flows.items()))
+                if flow.last_seen >= cutoff and len(flows) <= self.max_flows:
+                    break
+                if flow.last_seen >= cutoff:
+                    self.evicted += 1
+                del flows[key]
+                closed.append(flow)
+
+            baseline = self.polls == 0
+            self.polls += 1
+        if baseline:
+            return [], []
+        return opened, closed
+
+    def live(self):
+        """The open flows as of the last poll, least recently seen first"""
+        with self.lock:
+            return list(self.flows.values())
+
+    def by_remote(self):
+        """Open flows grouped by remote host: {ip: {'flows', 'ports', 'pids', 'first_seen', 'last_seen'}}"""
+        hosts = {}
+        for flow in self.live():
+            host = hosts.get(flow.raddr[0])
+            if host is None:
+                host = hosts[flow.raddr[0]] = {'flows': 0, 'ports': set(), 'pids': set(),
+                                               'first_seen': flow.first_seen, 'last_seen': flow.last_seen}
+            host['flows'] += 1
+            host['ports'].add(flow.raddr[1])
+            host['pids'].add(flow.pid)
+            host['first_seen'] = min(host['first_seen'], flow.first_seen)
+            host['last_seen'] = max(host['last_seen'], flow.last_seen)
+        return hosts
+
+    def __len__(self):
+        return len(self.flows)
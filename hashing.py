@@ -0,0 +1,159 @@
+"""Background content hashing for file events, with a cache keyed by file identity"""
+import hashlib
+import os
+import stat
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class HashCache:
+    """Digests keyed by (device, inode, size, mtime_ns), least recently used evicted first
+
+    A file whose key is unchanged has not been written since it was
+    hashed, so its digest is reused without reading it again.
+    """
+
+    def __init__(self, max_entries=50_000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            digest = self.entries.get(key)
+            if digest is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return digest
+
+    def put(self, key, digest):
+        with self.lock:
+            self.entries[key] = digest
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+def stat_key(st):
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def file_digest(path, chunk_size=1 << 20, algorithm='sha256'):
+    """Hex digest of a file read chunk_size bytes at a time"""
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashingPool:
+    """Hash the files named in events on worker threads and report each digest through a callback
+
+    submit() only records the request and returns, so it is safe to call
+    from any thread. Requests for a path already waiting are merged, and
+    past max_pending paths new ones are dropped (counted in skipped).
+    Files larger than max_bytes are not hashed. A file is stat'ed before
+    and after reading and the digest is only cached if the two agree, so a
+    file being written while it was read is not mistaken for a stable one.
+
+    on_digest(event_ids, path, digest, previous) is called from a worker;
+    previous is the last digest reported for the path, or None.
+    """
+
+    def __init__(self, on_digest, workers=2, max_bytes=64 << 20, chunk_size=1 << 20, cache_size=50_000,
+                 max_pending=10_000):
+        self.on_digest = on_digest
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self.cache = HashCache(cache_size)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hash')
+        self.lock = threading.Lock()
+        self.pending = {}  # path -> event ids waiting for its digest
+        self.last = OrderedDict()  # path -> last digest reported, bounded like the cache
+        self.hashed = 0
+        self.bytes_read = 0
+        self.too_large = 0
+        self.skipped = 0
+        self.failed = 0
+        self.closed = False
+
+    def submit(self, event_id, path):
+        """Queue path to be hashed for event_id; returns False if it was dropped"""
+        with self.lock:
+            if self.closed:
+                return False
+            waiting = self.pending.get(path)
+            if waiting is not None:
+                waiting.append(event_id)
+                return True
+            if len(self.pending) >= self.max_pending:
+                self.skipped += 1
+                return False
+            self.pending[path] = [event_id]
+            self.executor.submit(self._hash, path)
+        return True
+
+    def _hash(self, path):
+        with self.lock:
+            event_ids = self.pending.pop(path, [])
+        try:
+            digest = self.digest(path)
+        except OSError:
+            with self.lock:
+                self.failed += 1
+            return
+        if digest is None:
+            return
+        with self.lock:
+            previous = self.last.pop(path, None)
+            self.last[path] = digest
+            if len(self.last) > self.cache.max_entries:
+                self.last.popitem(last=False)
+        try:
+            self.on_digest(event_ids, path, digest, previous)
+        except Exception as e:
+            print(f"Error attaching file hash: {e}")
+
+    def digest(self, path):
+        """Digest of path from the cache or by reading it, or None if it is too large or not a regular file"""
+        st = os.stat(path)
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        if st.st_size > self.max_bytes:
+            with self.lock:
+                self.too_large += 1
+            return None
+        key = stat_key(st)
+        digest = self.cache.get(key)
+        if digest is not None:
+            return digest
+        digest = file_digest(path, self.chunk_size)
+        with self.lock:
+            self.hashed += 1
+            self.bytes_read += st.st_size
+        if stat_key(os.stat(path)) == key:
+            self.cache.put(key, digest)
+        return digest
+
+    def backlog(self):
+        with self.lock:
+            return len(self.pending)
+
+    def shutdown(self, wait=False):
+        with self.lock:
+            self.closed = True
+            self.pending.clear()
+        self.executor.shutdown(wait=wait)
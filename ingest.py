@@ -0,0 +1,492 @@
+"""Ingest stages between the file monitor and the event store"""
+import datetime
+import fnmatch
+import os
+import queue
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
+
+
+class QueueDrainer:
+    """Pull bounded batches off an event queue, polling faster as the backlog grows
+
+    drain() returns at most batch_size entries and sets interval (ms) for the
+    next poll: min_interval while a backlog remains, doubling towards
+    max_interval while the queue stays empty.
+    """
+
+    def __init__(self, source_queue, batch_size=500, min_interval=20, busy_interval=100,
+                 max_interval=2000):
+        self.queue = source_queue
+        self.batch_size = batch_size
+        self.min_interval = min_interval
+        self.busy_interval = busy_interval
+        self.max_interval = max_interval
+        self.interval = busy_interval
+        self.backlog = 0
+        self.lag = 0.0  # Seconds the oldest drained event spent queued
+        self.drained = 0
+
+    def drain(self):
+        batch = []
+        waited = None
+        try:
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+                if len(batch) == 1:
+                    # Queues that time their entries say how long it waited; an entry's
+                    # Time is when the event happened, which can be well before it was queued
+                    waited = getattr(self.queue, 'last_wait', None)
+        except queue.Empty:
+            pass
+
+        self.backlog = self.queue.qsize()
+        self.drained += len(batch)
+        if waited is not None:
+            self.lag = waited
+        elif batch and isinstance(batch[0].get('Time'), datetime.datetime):
+            self.lag = max(0.0, (datetime.datetime.now() - batch[0]['Time']).total_seconds())
+        elif not batch:
+            self.lag = 0.0
+
+        if self.backlog:
+            self.interval = self.min_interval
+        elif batch:
+            self.interval = self.busy_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * 2)
+        return batch
+
+
+class _PendingEvent:
+    __slots__ = ('event_type', 'src_path', 'dest_path', 'count', 'first_seen', 'deadline')
+
+    def __init__(self, event_type, src_path, dest_path, now):
+        self.event_type = event_type
+        self.src_path = src_path
+        self.dest_path = dest_path
+        self.count = 1
+        self.first_seen = now
+        self.deadline = now
+
+
+class EventCoalescer:
+    """Merge bursts of raw file events per path before they are logged
+
+    Each path's events are held until its window passes with no further
+    activity (at most max_hold_factor windows in total). While held:
+    repeated modifications merge into one event with a count, a file
+    created and deleted again (temp files) disappears entirely, a delete
+    followed by a create of the same path becomes a modification (also
+    when the new file is renamed into place, before or after the old one
+    is deleted or renamed away, as editors do on save), and a delete
+    followed by a create of the same file name elsewhere becomes a move.
+    A held event is never replaced, only merged with the next one for its
+    path. At most max_pending paths are held; beyond that the oldest is
+    emitted early.
+
+    emit(event_type, src_path, dest_path, count) receives the merged events.
+    """
+
+    def __init__(self, emit, window=0.5, path_windows=None, max_pending=10000,
+                 max_hold_factor=4, clock=time.monotonic):
+        self.emit = emit
+        self.window = window
+        # Longest matching prefix wins
+        self.path_windows = sorted((path_windows or {}).items(), key=lambda item: len(item[0]),
+                                   reverse=True)
+        self.max_pending = max_pending
+        self.max_hold_factor = max_hold_factor
+        self.clock = clock
+        self.pending = OrderedDict()  # key path -> _PendingEvent, least recently touched first
+        self.deletes_by_name = {}  # file name -> key path of a held delete
+        self._displaced = []  # held events a second move onto their path pushed out, emitted by add()
+        self.lock = threading.Lock()
+        self.events_in = 0
+        self.events_out = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def window_for(self, path):
+        for prefix, window in self.path_windows:
+            if path.startswith(prefix):
+                return window
+        return self.window
+
+    def add(self, event_type, src_path, dest_path=None):
+        """Feed one raw watchdog event (called on the observer thread)"""
+        overflow = []
+        with self.lock:
+            self.events_in += 1
+            now = self.clock()
+            if event_type == 'created':
+                pending = self._on_created(src_path, now)
+            elif event_type == 'deleted':
+                pending = self._on_deleted(src_path, now)
+            elif event_type == 'moved':
+                pending = self._on_moved(src_path, dest_path, now)
+            else:
+                pending = self._touch(src_path, 'modified', None, now)
+
+            if pending is not None:
+                key = pending.dest_path if pending.event_type == 'moved' else pending.src_path
+                hold = self.window_for(key)
+                pending.deadline = min(now + hold, pending.first_seen + hold * self.max_hold_factor)
+                self.pending[key] = pending
+                self.pending.move_to_end(key)
+
+            overflow, self._displaced = self._displaced, []
+            while len(self.pending) > self.max_pending:
+                overflow.append(self._pop(next(iter(self.pending))))
+
+        self._emit_all(overflow)
+
+    def _touch(self, path, event_type, dest_path, now):
+        pending = self.pending.get(path)
+        if pending is None:
+            return _PendingEvent(event_type, path, dest_path, now)
+        pending.count += 1
+        return pending
+
+    def _arrive(self, path, arriving):
+        """Merge a file arriving at path (created there, or moved there) with what is held for path"""
+        pending = self.pending.get(path)
+        if pending is None:
+            return arriving
+        self._pop(path)
+        if pending.event_type == 'moved' and arriving.event_type == 'moved':
+            # Two moves onto the same name: report the first as it was
+            self._displaced.append(pending)
+            return arriving
+        if arriving.event_type == 'created':
+            # Deleted and recreated in place (atomic save): a modification; otherwise the held event stands
+            arriving.event_type = 'modified' if pending.event_type == 'deleted' else pending.event_type
+            arriving.src_path, arriving.dest_path = pending.src_path, pending.dest_path
+        arriving.count += pending.count
+        arriving.first_seen = min(arriving.first_seen, pending.first_seen)
+        return arriving
+
+    def _on_created(self, path, now):
+        name = os.path.basename(path)
+        deleted_key = self.deletes_by_name.get(name)
+        if deleted_key is not None and deleted_key != path:
+            # Deleted here, created there with the same name: a move
+            deleted = self._pop(deleted_key)
+            moved = _PendingEvent('moved', deleted.src_path, path, now)
+            moved.count = deleted.count + 1
+            moved.first_seen = deleted.first_seen
+            return self._arrive(path, moved)
+        return self._arrive(path, _PendingEvent('created', path, None, now))
+
+    def _on_deleted(self, path, now):
+        pending = self.pending.get(path)
+        if pending is not None and pending.event_type == 'created':
+            # Created and deleted inside the window: a temp file, drop it
+            self._pop(path)
+            return None
+        if pending is not None and pending.event_type == 'moved':
+            # Moved here and deleted again: the original is gone, unless a new file already took its place
+            self._pop(path)
+            held = self.pending.get(pending.src_path)
+            if held is not None:
+                if held.event_type == 'created':
+                    held.event_type = 'modified'
+                held.count += pending.count + 1
+                held.first_seen = min(held.first_seen, pending.first_seen)
+                return held
+            deleted = _PendingEvent('deleted', pending.src_path, None, now)
+            deleted.count = pending.count + 1
+            deleted.first_seen = pending.first_seen
+            self.deletes_by_name[os.path.basename(deleted.src_path)] = deleted.src_path
+            return deleted
+
+        pending = self._touch(path, 'deleted', None, now)
+        pending.event_type = 'deleted'
+        self.deletes_by_name[os.path.basename(path)] = path
+        return pending
+
+    def _on_moved(self, src_path, dest_path, now):
+        pending = self.pending.get(src_path)
+        if pending is not None and pending.event_type == 'created':
+            # Written under a temp name and renamed into place: a create
+            self._pop(src_path)
+            created = _PendingEvent('created', dest_path, None, now)
+            created.count = pending.count + 1
+            created.first_seen = pending.first_seen
+            return self._arrive(dest_path, created)
+        if pending is not None:
+            self._pop(src_path)
+            if pending.event_type == 'moved':
+                src_path = pending.src_path  # Chained renames: report first source to final name
+        moved = _PendingEvent('moved', src_path, dest_path, now)
+        if pending is not None:
+            moved.count += pending.count
+            moved.first_seen = pending.first_seen
+        return self._arrive(dest_path, moved)
+
+    def _forget_delete(self, path):
+        name = os.path.basename(path)
+        if self.deletes_by_name.get(name) == path:
+            del self.deletes_by_name[name]
+
+    def _pop(self, key):
+        pending = self.pending.pop(key)
+        if pending.event_type == 'deleted':
+            self._forget_delete(key)
+        return pending
+
+    def flush(self, force=False):
+        """Emit every held event whose window has passed (all of them if force)"""
+        with self.lock:
+            now = self.clock()
+            ready = [key for key, pending in self.pending.items() if force or pending.deadline <= now]
+            batch = [self._pop(key) for key in ready]
+        self._emit_all(batch)
+        return len(batch)
+
+    def _emit_all(self, batch):
+        for pending in batch:
+            self.events_out += 1
+            self.emit(pending.event_type, pending.src_path, pending.dest_path, pending.count)
+
+    def start(self, interval=0.1):
+        """Flush expired events from a background thread"""
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                self.flush()
+            self.flush(force=True)
+
+        self._thread = threading.Thread(target=run, name='event-coalescer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def normalize_path(path):
+    return path.replace('\\', '/').rstrip('/').lower()
+
+
+class _CompiledRules:
+    """One rule set (prefixes, extensions, globs) compiled for a single pass per path"""
+
+    def __init__(self, prefixes=(), extensions=(), globs=()):
+        self.trie = {}
+        for prefix in prefixes:
+            node = self.trie
+            for part in normalize_path(os.path.expanduser(prefix)).split('/'):
+                node = node.setdefault(part, {})
+            node[None] = f"prefix:{prefix}"
+
+        self.extensions = {}
+        for extension in extensions:
+            extension = extension.lower()
+            if not extension.startswith('.'):
+                extension = '.' + extension
+            self.extensions[extension] = f"ext:{extension}"
+
+        self.glob_names = [f"glob:{pattern}" for pattern in globs]
+        patterns = [f"(?P<g{i}>{fnmatch.translate(normalize_path(pattern))})" for i, pattern in enumerate(globs)]
+        self.glob_regex = re.compile('|'.join(patterns)) if patterns else None
+
+    def match(self, normalized):
+        """Return the name of the first matching rule, or None"""
+        node = self.trie
+        for part in normalized.split('/'):
+            node = node.get(part)
+            if node is None:
+                break
+            if None in node:
+                return node[None]
+
+        dot = normalized.rfind('.')
+        if dot > normalized.rfind('/'):
+            rule = self.extensions.get(normalized[dot:])
+            if rule is not None:
+                return rule
+
+        if self.glob_regex is not None:
+            found = self.glob_regex.match(normalized)
+            if found:
+                return self.glob_names[int(found.lastgroup[1:])]
+        return None
+
+
+class PathFilter:
+    """Include/exclude rules evaluated before a file event does any work
+
+    Directory prefixes are compiled into a trie of path components,
+    extensions into a set lookup and every glob into one combined regex.
+    Paths are compared case-insensitively with '/' separators. A path is
+    dropped when an exclude rule matches and no include rule does; drops
+    are counted per rule in dropped.
+    """
+
+    def __init__(self, exclude_prefixes=(), exclude_extensions=(), exclude_globs=(),
+                 include_prefixes=(), include_extensions=(), include_globs=()):
+        self.exclude = _CompiledRules(exclude_prefixes, exclude_extensions, exclude_globs)
+        self.include = _CompiledRules(include_prefixes, include_extensions, include_globs)
+        self.dropped = Counter()
+        self.passed = 0
+
+    def excluded_by(self, path):
+        """Name of the exclude rule that drops path (None if it is kept)"""
+        normalized = normalize_path(path)
+        rule = self.exclude.match(normalized)
+        if rule is None or self.include.match(normalized) is not None:
+            return None
+        return rule
+
+    def allows(self, path, dest_path=None):
+        """True if the event should be logged; a move is kept if either end is"""
+        rule = self.excluded_by(path)
+        if rule is not None and dest_path is not None and self.excluded_by(dest_path) is None:
+            rule = None
+        if rule is None:
+            self.passed += 1
+            return True
+        self.dropped[rule] += 1
+        return False
+
+    @property
+    def dropped_total(self):
+        return sum(self.dropped.values())
+
+
+class BoundedEventQueue:
+    """Queue.Queue stand-in with a size limit and a choice of overload policy
+
+    drop_oldest  discard the oldest held event to make room
+    drop_low     discard the oldest event of the lowest severity held (or
+                 the incoming one if it ranks lower still)
+    sample       past high_water, admit only sample_keep of every
+                 sample_every events per directory, then drop oldest if full
+    block        make the producer (the observer thread) wait for room, up to
+                 block_timeout seconds, then drop the incoming event
+
+    dropped counts discarded events and high_watermark the deepest the
+    queue has been. Each entry's enqueue time is kept beside it, so
+    oldest_age() and last_wait (how long the last entry taken had been
+    queued) don't depend on the entry's own Time.
+    """
+
+    POLICIES = ('drop_oldest', 'drop_low', 'sample', 'block')
+    SEVERITY_RANK = {'Info': 0, 'Low': 1, 'Medium': 2, 'High': 3, 'Critical': 4}
+
+    def __init__(self, maxsize=50000, policy='drop_oldest', sample_keep=1, sample_every=10,
+                 high_water=0.8, block_timeout=1.0):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.sample_keep = sample_keep
+        self.sample_every = sample_every
+        self.high_water = int(maxsize * high_water)
+        self.block_timeout = block_timeout
+
+        self.slots = deque()  # [entry, rank, alive, enqueued (monotonic)], FIFO
+        self.by_rank = defaultdict(deque)  # rank -> live slots, FIFO
+        self.size = 0
+        self.dead = 0
+        self.sample_counts = {}
+        self.cond = threading.Condition()
+
+        self.dropped = 0
+        self.high_watermark = 0
+        self.put_count = 0
+        self.last_wait = 0.0
+
+    def put(self, entry, block=True, timeout=None):
+        """Add an event; returns False if the overload policy discarded it"""
+        rank = self.SEVERITY_RANK.get(entry.get('Severity'), 1)
+        with self.cond:
+            self.put_count += 1
+            if self.policy == 'sample' and self.size >= self.high_water and not self._sampled_in(entry):
+                self.dropped += 1
+                return False
+
+            if self.size >= self.maxsize:
+                if self.policy == 'block' and block:
+                    self.cond.wait_for(lambda: self.size < self.maxsize,
+                                       timeout if timeout is not None else self.block_timeout)
+                    if self.size >= self.maxsize:
+                        self.dropped += 1
+                        return False
+                elif self.policy == 'drop_low':
+                    lowest = min(r for r, slots in self.by_rank.items() if slots)
+                    if rank < lowest:
+                        self.dropped += 1
+                        return False
+                    self._discard(self.by_rank[lowest][0])
+                else:
+                    self._discard(self._oldest())
+
+            slot = [entry, rank, True, time.monotonic()]
+            self.slots.append(slot)
+            self.by_rank[rank].append(slot)
+            self.size += 1
+            self.high_watermark = max(self.high_watermark, self.size)
+            self.cond.notify()
+            return True
+
+    def put_nowait(self, entry):
+        return self.put(entry, block=False)
+
+    def _sampled_in(self, entry):
+        directory = os.path.dirname(entry.get('FilePath', ''))
+        if len(self.sample_counts) > 10000:
+            self.sample_counts.clear()
+        seen = self.sample_counts.get(directory, 0)
+        self.sample_counts[directory] = seen + 1
+        return seen % self.sample_every < self.sample_keep
+
+    def _oldest(self):
+        while not self.slots[0][2]:
+            self.slots.popleft()
+            self.dead -= 1
+        return self.slots[0]
+
+    def _discard(self, slot):
+        """Drop a live slot; it is unlinked from its rank now and from the FIFO lazily"""
+        slot[2] = False
+        rank_slots = self.by_rank[slot[1]]
+        if rank_slots and rank_slots[0] is slot:
+            rank_slots.popleft()
+        else:
+            rank_slots.remove(slot)
+        self.size -= 1
+        self.dead += 1
+        self.dropped += 1
+        if self.dead > self.maxsize:
+            self.slots = deque(s for s in self.slots if s[2])
+            self.dead = 0
+
+    def get_nowait(self):
+        with self.cond:
+            if not self.size:
+                raise queue.Empty
+            slot = self._oldest()
+            self.slots.popleft()
+            self.by_rank[slot[1]].popleft()
+            self.size -= 1
+            self.last_wait = time.monotonic() - slot[3]
+            self.cond.notify()
+            return slot[0]
+
+    def qsize(self):
+        return self.size
+
+    def oldest_age(self):
+        """Seconds the oldest held event has been queued (0 when empty)"""
+        with self.cond:
+            if not self.size:
+                return 0.0
+            return time.monotonic() - self._oldest()[3]
+
+    def empty(self):
+        return not self.size
@@ -0,0 +1,323 @@
+"""Durable, segmented append-only journal behind the event store"""
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+
+SEGMENT_MAGIC = b'SAMJRNL1'
+FOOTER_MAGIC = b'SAMFOOT1'
+END_MAGIC = b'SAMEND01'
+
+RECORD_HEADER = struct.Struct('<II')  # payload length, crc32(payload)
+ROW_HEADER = struct.Struct('<qIIIIII')  # ts, then byte lengths of the six variable fields
+FOOTER_HEADER = struct.Struct('<Qqqi')  # records, min ts, max ts, index entries
+INDEX_ENTRY = struct.Struct('<Qq')  # block start offset, max ts within the block
+TRAILER = struct.Struct('<Q')  # footer offset, followed by END_MAGIC
+
+SEGMENT_NAME = re.compile(r'^segment-(\d{8})\.jrnl$')
+NO_TS = -(1 << 63)
+
+
+def encode_row(ts, source, type_name, severity, event, details, extra=None):
+    fields = [source.encode('utf-8'), type_name.encode('utf-8'), severity.encode('utf-8'),
+              event.encode('utf-8'), details.encode('utf-8'),
+              json.dumps(extra, default=str).encode('utf-8') if extra else b'']
+    payload = ROW_HEADER.pack(ts, *(len(field) for field in fields)) + b''.join(fields)
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_row(buffer, offset, length):
+    """Decode one payload into (ts, source, type, severity, event, details, extra)"""
+    ts, *lengths = ROW_HEADER.unpack_from(buffer, offset)
+    position = offset + ROW_HEADER.size
+    values = []
+    for size in lengths:
+        values.append(bytes(buffer[position:position + size]).decode('utf-8'))
+        position += size
+    extra = json.loads(values[5]) if values[5] else None
+    return (ts, values[0], values[1], values[2], values[3], values[4], extra)
+
+
+class EventJournal:
+    """Size-rotated journal segments with an index footer on each sealed segment
+
+    Records are length + crc32 framed. The active segment is written through
+    a buffered file and fsynced in batches (every fsync_every records or
+    fsync_interval seconds, whichever comes first) by a background thread.
+    When a segment passes segment_bytes it is sealed: a footer with the
+    record count, time bounds and a sparse (offset, max ts) index per
+    index_every records is appended. On open, an unsealed tail segment is
+    scanned and cut back to its last intact record, so a crash mid-write
+    costs at most the unsynced batch.
+
+    Sealed segments whose newest record is older than max_age seconds, and
+    the oldest ones while the journal is over max_bytes, are deleted when
+    the journal is opened and whenever a segment is sealed.
+    """
+
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, index_every=256,
+                 fsync_every=1000, fsync_interval=1.0, max_age=None, max_bytes=None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.index_every = index_every
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.lock = threading.Lock()
+        self.records_written = 0
+        self.bytes_written = 0
+        self.recovered_bytes_dropped = 0
+        self.segments_pruned = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._open_tail()
+        self.prune()
+
+        self._unsynced = 0
+        self._sync_wanted = threading.Event()
+        self._closed = threading.Event()
+        self._syncer = threading.Thread(target=self._sync_loop, name='journal-fsync', daemon=True)
+        self._syncer.start()
+
+    # ============ SEGMENTS ============
+
+    def segments(self):
+        """Segment paths, oldest first"""
+        names = sorted(name for name in os.listdir(self.directory) if SEGMENT_NAME.match(name))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"segment-{number:08d}.jrnl")
+
+    def _open_tail(self):
+        segments = self.segments()
+        if segments and read_footer(segments[-1]) is None:
+            self._number = int(SEGMENT_NAME.match(os.path.basename(segments[-1])).group(1))
+            self._recover(segments[-1])
+        else:
+            self._number = int(SEGMENT_NAME.match(os.path.basename(segments[-1])).group(1)) + 1 if segments else 0
+            self._start_segment()
+
+    def _start_segment(self):
+        path = self._segment_path(self._number)
+        self._file = open(path, 'wb')
+        self._file.write(SEGMENT_MAGIC)
+        self._offset = len(SEGMENT_MAGIC)
+        self._reset_index()
+
+    def _reset_index(self):
+        self._count = 0
+        self._min_ts = None
+        self._max_ts = None
+        self._index = []
+        self._block_start = self._offset
+        self._block_max = NO_TS
+
+    def _recover(self, path):
+        """Reopen an unsealed segment, cutting it back to its last intact record"""
+        size = os.path.getsize(path)
+        self._offset = len(SEGMENT_MAGIC)
+        self._reset_index()
+        good_end = self._offset
+        if size > len(SEGMENT_MAGIC):
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                if view[:len(SEGMENT_MAGIC)] == SEGMENT_MAGIC:
+                    for _, end, ts in scan_records(view, len(SEGMENT_MAGIC)):
+                        self._track(ts, end)
+                        good_end = end
+        self.recovered_bytes_dropped = max(0, size - good_end)
+        self._file = open(path, 'r+b')
+        if size < len(SEGMENT_MAGIC) or good_end == len(SEGMENT_MAGIC):
+            self._file.seek(0)
+            self._file.write(SEGMENT_MAGIC)
+        self._file.truncate(good_end)
+        self._file.seek(good_end)
+        self._offset = good_end
+
+    def _track(self, ts, end):
+        """Account one record that ends at offset end"""
+        self._count += 1
+        self._min_ts = ts if self._min_ts is None else min(self._min_ts, ts)
+        self._max_ts = ts if self._max_ts is None else max(self._max_ts, ts)
+        self._block_max = max(self._block_max, ts)
+        if self._count % self.index_every == 0:
+            self._index.append((self._block_start, self._block_max))
+            self._block_start = end
+            self._block_max = NO_TS
+
+    def _seal(self):
+        if self._count % self.index_every:
+            self._index.append((self._block_start, self._block_max))
+        footer_offset = self._offset
+        footer = [FOOTER_MAGIC, FOOTER_HEADER.pack(self._count, self._min_ts or 0, self._max_ts or 0,
+                                                   len(self._index))]
+        footer.extend(INDEX_ENTRY.pack(offset, ts) for offset, ts in self._index)
+        footer.append(TRAILER.pack(footer_offset))
+        footer.append(END_MAGIC)
+        self._file.write(b''.join(footer))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._number += 1
+        self._start_segment()
+        self.prune()
+
+    def prune(self, now=None):
+        """Delete sealed segments past max_age or, oldest first, beyond max_bytes; returns how many"""
+        if self.max_age is None and self.max_bytes is None:
+            return 0
+        now = time.time() if now is None else now
+        active = self._segment_path(self._number)
+        sealed = [path for path in self.segments() if path != active]
+        sizes = {path: os.path.getsize(path) for path in sealed}
+        total = sum(sizes.values()) + self._offset
+        removed = 0
+        for path in sealed:
+            footer = read_footer(path)
+            newest = footer[2] / 1_000_000 if footer is not None else os.path.getmtime(path)
+            expired = self.max_age is not None and newest < now - self.max_age
+            oversize = self.max_bytes is not None and total > self.max_bytes
+            if not (expired or oversize):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                break
+            total -= sizes[path]
+            removed += 1
+        self.segments_pruned += removed
+        return removed
+
+    # ============ WRITE ============
+
+    def append(self, ts, source, type_name, severity, event, details, extra=None):
+        record = encode_row(ts, source, type_name, severity, event, details, extra)
+        with self.lock:
+            self._file.write(record)
+            self._offset += len(record)
+            self._track(ts, self._offset)
+            self.records_written += 1
+            self.bytes_written += len(record)
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                self._sync_wanted.set()
+            if self._offset >= self.segment_bytes:
+                self._seal()
+                self._unsynced = 0
+
+    def sync(self):
+        """Flush and fsync everything appended so far"""
+        with self.lock:
+            if self._file is None or self._file.closed:
+                return
+            self._file.flush()
+            fd = self._file.fileno()
+            self._unsynced = 0
+        # fsync outside the lock so appends keep flowing while the disk catches up
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass  # Segment was sealed (and synced) meanwhile
+
+    def _sync_loop(self):
+        while not self._closed.is_set():
+            self._sync_wanted.wait(self.fsync_interval)
+            self._sync_wanted.clear()
+            if self._unsynced:
+                self.sync()
+
+    def close(self):
+        self._closed.set()
+        self._sync_wanted.set()
+        self.sync()
+        with self.lock:
+            self._file.close()
+
+    # ============ READ ============
+
+    def load(self, since=None):
+        """Rows with ts >= since (epoch us) from every segment, oldest segment first
+
+        Sealed segments entirely older than since are skipped from their
+        footer alone, and within a segment whole index blocks are skipped.
+        """
+        self.sync()
+        rows = []
+        for path in self.segments():
+            rows.extend(read_segment(path, since))
+        return rows
+
+
+def read_footer(path):
+    """(count, min ts, max ts, [(offset, block max ts)], footer offset) of a sealed segment"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            tail = TRAILER.size + len(END_MAGIC)
+            if size < len(SEGMENT_MAGIC) + tail:
+                return None
+            f.seek(size - tail)
+            trailer = f.read(tail)
+            if trailer[TRAILER.size:] != END_MAGIC:
+                return None
+            footer_offset, = TRAILER.unpack_from(trailer)
+            f.seek(footer_offset)
+            if f.read(len(FOOTER_MAGIC)) != FOOTER_MAGIC:
+                return None
+            count, min_ts, max_ts, entries = FOOTER_HEADER.unpack(f.read(FOOTER_HEADER.size))
+            raw = f.read(entries * INDEX_ENTRY.size)
+            index = [INDEX_ENTRY.unpack_from(raw, i * INDEX_ENTRY.size) for i in range(entries)]
+            return count, min_ts, max_ts, index, footer_offset
+    except (OSError, struct.error):
+        return None
+
+
+def scan_records(view, offset, end=None):
+    """Yield (offset, end, ts) for each intact record, stopping at the first damaged one"""
+    end = len(view) if end is None else end
+    while offset + RECORD_HEADER.size <= end:
+        length, crc = RECORD_HEADER.unpack_from(view, offset)
+        start = offset + RECORD_HEADER.size
+        if length < ROW_HEADER.size or start + length > end:
+            return
+        if zlib.crc32(view[start:start + length]) != crc:
+            return
+        ts, = struct.unpack_from('<q', view, start)
+        yield offset, start + length, ts
+        offset = start + length
+
+
+def read_segment(path, since=None):
+    """Decode the rows of one segment through a memory map"""
+    footer = read_footer(path)
+    if footer is not None and since is not None and footer[2] < since:
+        return []
+
+    rows = []
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= len(SEGMENT_MAGIC):
+            return rows
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            if view[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+                return rows
+            if footer is None:
+                blocks = [(len(SEGMENT_MAGIC), len(view))]
+            else:
+                index, footer_offset = footer[3], footer[4]
+                starts = [offset for offset, _ in index] + [footer_offset]
+                blocks = [(starts[i], starts[i + 1]) for i, (_, block_max) in enumerate(index)
+                          if since is None or block_max >= since]
+            for block_start, block_end in blocks:
+                for offset, end, ts in scan_records(view, block_start, block_end):
+                    if since is None or ts >= since:
+                        start = offset + RECORD_HEADER.size
+                        rows.append(decode_row(view, start, end - start))
+    return rows
@@ -0,0 +1,155 @@
+"""Counters, gauges and timers for the monitor's hot paths"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class TimerStats:
+    """Running totals plus a window of recent durations for percentiles"""
+
+    def __init__(self, window=200):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+        self.recent.append(seconds)
+
+    def summary(self):
+        recent = sorted(self.recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            'count': self.count,
+            'total_s': round(self.total, 4),
+            'last_ms': round(self.last * 1000, 3),
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p95_ms': round(p95 * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of named counters, gauges and timers
+
+    Counters only go up; snapshot() also turns each one into a per-second
+    rate over the time since the same reader's previous snapshot, so the
+    panel and the file dump each see rates over their own interval.
+    Gauges hold the last value set. Timers keep count/total/max and a
+    recent window for p95.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self.created = time.monotonic()
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.timers = {}
+        self._previous = {}  # reader -> (monotonic time, counters) at its last snapshot
+        self._dumper = None
+        self._stop = threading.Event()
+
+    def incr(self, name, count=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + count
+
+    def gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe(self, name, seconds):
+        with self.lock:
+            stats = self.timers.get(name)
+            if stats is None:
+                stats = self.timers[name] = TimerStats(self.window)
+            stats.add(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self, reader='default'):
+        """Current values as a plain dict, with counter rates since reader's last snapshot"""
+        now = time.monotonic()
+        with self.lock:
+            then, previous = self._previous.get(reader, (self.created, {}))
+            elapsed = max(now - then, 1e-9)
+            rates = {name: round((value - previous.get(name, 0)) / elapsed, 2)
+                     for name, value in self.counters.items()}
+            self._previous[reader] = (now, dict(self.counters))
+            return {
+                'time': time.time(),
+                'counters': dict(self.counters),
+                'rates': rates,
+                'gauges': dict(self.gauges),
+                'timers': {name: stats.summary() for name, stats in self.timers.items()},
+            }
+
+    # ============ DUMPING ============
+
+    def dump(self, path, snapshot=None, max_bytes=None):
+        """Append one snapshot to path as a JSON line, first rolling path over to path.1 past max_bytes"""
+        snapshot = snapshot or self.snapshot('dump')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if max_bytes is not None and os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+            os.replace(path, path + '.1')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(snapshot, default=str) + "\n")
+
+    def start_dumping(self, path, interval=30.0, sample=None, max_bytes=None):
+        """Dump every interval seconds on a daemon thread, calling sample() first to refresh gauges"""
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    if sample:
+                        sample()
+                    self.dump(path, max_bytes=max_bytes)
+                except Exception as e:
+                    print(f"Metrics dump error: {e}")
+
+        self._dumper = threading.Thread(target=run, name='metrics-dump', daemon=True)
+        self._dumper.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def format_snapshot(snapshot):
+    """Render a snapshot as aligned text for the diagnostics panel"""
+    lines = ["RATES (per second)"]
+    for name, rate in sorted(snapshot['rates'].items()):
+        if name.startswith('events.'):
+            lines.append(f"  {name:<42} {rate:>12,.1f}")
+
+    lines.append("")
+    lines.append("GAUGES")
+    for name, value in sorted(snapshot['gauges'].items()):
+        if name.endswith('_bytes'):
+            lines.append(f"  {name:<42} {value / 1e6:>10,.1f} MB")
+        else:
+            lines.append(f"  {name:<42} {value:>12,}")
+
+    lines.append("")
+    lines.append(f"TIMERS (ms){'':<33} {'last':>9} {'mean':>9} {'p95':>9} {'max':>9} {'count':>7}")
+    for name, stats in sorted(snapshot['timers'].items()):
+        lines.append(f"  {name:<42} {stats['last_ms']:>9.1f} {stats['mean_ms']:>9.1f} "
+                     f"{stats['p95_ms']:>9.1f} {stats['max_ms']:>9.1f} {stats['count']:>7,}")
+
+    lines.append("")
+    lines.append("COUNTERS")
+    for name, value in sorted(snapshot['counters'].items()):
+        lines.append(f"  {name:<42} {value:>12,}")
+    return "\n".join(lines)
@@ -0,0 +1,73 @@
+"""Process table that turns successive polls into started/exited processes"""
+import threading
+import time
+from collections import namedtuple
+
+ProcessInfo = namedtuple('ProcessInfo', 'pid create_time name username')
+
+
+class ProcessTracker:
+    """Live processes by pid, each with its create_time, diffed poll to poll
+
+    A poll lists pids and reads each known pid's create_time (one cheap
+    call per process); attrs are only queried for pids not already in the
+    table, so the expensive part follows process churn rather than the
+    number of processes. A pid whose create_time changed was reused
+    between two polls and is reported as an exit plus a start. The first
+    poll is a baseline and reports nothing. The table only ever holds
+    live processes.
+    """
+
+    def __init__(self, psutil, attrs=('name', 'username', 'create_time')):
+        self.psutil = psutil
+        self.attrs = list(attrs)
+        self.table = {}  # pid -> ProcessInfo
+        self.lock = threading.Lock()
+        self.polls = 0
+        self.last_poll_seconds = 0.0
+
+    def poll(self):
+        """Return (started, exited) ProcessInfo lists since the previous poll"""
+        start = time.perf_counter()
+        with self.lock:
+            pids = set(self.psutil.pids())
+            table = self.table
+            exited = [table.pop(pid) for pid in set(table) - pids]
+            for pid in list(table):
+                created = self.started_at(pid)
+                if created is not None and table[pid].create_time not in (None, created):
+                    exited.append(table.pop(pid))  # Reused: the old process is gone
+            started = []
+            for pid in pids - set(table):
+                info = self.query(pid)
+                if info is not None:
+                    table[pid] = info
+                    started.append(info)
+            baseline = self.polls == 0
+            self.polls += 1
+            self.last_poll_seconds = time.perf_counter() - start
+        if baseline:
+            return [], []
+        return started, exited
+
+    def started_at(self, pid):
+        """create_time of whatever process has pid now, or None if it cannot be read"""
+        try:
+            return self.psutil.Process(pid).create_time()
+        except Exception:
+            return None
+
+    def query(self, pid):
+        try:
+            values = self.psutil.Process(pid).as_dict(self.attrs, ad_value=None)
+        except Exception:
+            return None  # Exited already, or not inspectable at all
+        return ProcessInfo(pid, values.get('create_time'), values.get('name'), values.get('username'))
+
+    def running(self):
+        """The live processes as of the last poll"""
+        with self.lock:
+            return list(self.table.values())
+
+    def __len__(self):
+        return len(self.table)
@@ -0,0 +1,244 @@
+"""Threat rules compiled into a few combined matchers and applied to every event at ingest"""
+import fnmatch
+import json
+import re
+from collections import Counter
+from ingest import BoundedEventQueue, normalize_path
+
+SEVERITY_RANK = BoundedEventQueue.SEVERITY_RANK
+EVENT_ID = re.compile(r'Event ID: (\d+)')
+PATH_LINE = re.compile(r'^(?:Path|File moved from|To): (.+)$', re.MULTILINE)
+
+# Literals shorter than this are too common to be worth indexing a regex or glob by
+MIN_LITERAL = 3
+
+
+def trie_pattern(words):
+    """One regex matching the longest of words at a position, its alternatives sharing prefixes"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+def regex_literal(pattern):
+    """A literal every match of pattern starts with (lowercased), or '' if there is no safe one"""
+    if '|' in pattern:
+        return ''
+    position = 2 if pattern.startswith('\\b') else 0
+    literal = []
+    while position < len(pattern) and pattern[position] not in '.^$*+?{}[]|()\\':
+        literal.append(pattern[position])
+        position += 1
+    if literal and position < len(pattern) and pattern[position] in '*?{':
+        literal.pop()  # The last character may repeat zero times
+    literal = ''.join(literal).lower()
+    return literal if len(literal) >= MIN_LITERAL else ''
+
+
+def glob_literals(normalized):
+    """The runs of plain characters in a glob, all of which any matching path contains"""
+    chunks = re.split(r'[*?]', re.sub(r'\[[^\]]*\]', '*', normalized))
+    return {chunk for chunk in chunks if len(chunk) >= MIN_LITERAL}
+
+
+class LiteralIndex:
+    """Find every indexed literal occurring in a text with one regex search
+
+    The literals are compiled into a trie-shaped regex inside a lookahead,
+    so the search tries each position once and reports the longest literal
+    starting there; the indexed literals that are prefixes of it were
+    worked out when the index was built.
+    """
+
+    def __init__(self, pairs):
+        self.payloads = {}  # literal -> payloads
+        for literal, payload in pairs:
+            self.payloads.setdefault(literal, []).append(payload)
+        self.prefixes = {literal: tuple(literal[:end] for end in range(1, len(literal) + 1)
+                                        if literal[:end] in self.payloads)
+                         for literal in self.payloads}
+        self.regex = re.compile(f"(?=({trie_pattern(self.payloads)}))") if self.payloads else None
+
+    def literals(self, text):
+        """The distinct indexed literals in text"""
+        found = set()
+        if self.regex is not None:
+            for match in self.regex.finditer(text):
+                found.update(self.prefixes[match.group(1)])
+        return found
+
+    def find(self, text):
+        """The payloads of every indexed literal in text"""
+        return {payload for literal in self.literals(text) for payload in self.payloads[literal]}
+
+
+class Rule:
+    __slots__ = ('id', 'description', 'score', 'severity', 'types')
+
+    def __init__(self, spec):
+        self.id = spec['id']
+        self.description = spec.get('description', '')
+        self.score = int(spec.get('score', 10))
+        self.severity = spec.get('severity')
+        self.types = set(spec['types']) if spec.get('types') else None
+        if self.severity is not None and self.severity not in SEVERITY_RANK:
+            raise ValueError(f"Rule {self.id}: unknown severity {self.severity}")
+
+
+class RuleEngine:
+    """Keywords, regexes, path globs and event IDs from a rule file, each kind matched in one pass
+
+    All keywords go into one LiteralIndex over the event text. Each regex
+    is indexed by a literal it cannot match without and each glob by all
+    of its literal runs, so a pass over the text (or path) yields the few
+    candidates worth running. Regexes without such a literal are joined
+    into one combined prefilter; globs without one are always tried.
+    Event IDs are a dict lookup. Text is matched case-insensitively
+    against Event and Details, paths against FilePath and the Path lines
+    of Details.
+
+    A matching event gets 'Rules' (comma-separated ids) and 'Score' (the
+    sum of the rules' scores), and its Severity is raised to the highest
+    severity among them. A rule with types only applies to those Types.
+    """
+
+    def __init__(self, specs=()):
+        self.rules = {}
+        text_literals = []  # (literal, ('rule', id) or ('regex', index))
+        path_literals = []  # (literal, glob index)
+        self.glob_literal_counts = []  # glob index -> literals a path needs to be a candidate
+        self.regexes = []  # (rule id, compiled)
+        self.globs = []  # (rule id, compiled)
+        self.unindexed_globs = []
+        self.event_ids = {}  # event id -> rule ids
+        for spec in specs:
+            rule = Rule(spec)
+            if rule.id in self.rules:
+                raise ValueError(f"Duplicate rule id {rule.id}")
+            self.rules[rule.id] = rule
+            for keyword in spec.get('keywords', ()):
+                text_literals.append((keyword.lower(), ('rule', rule.id)))
+            for pattern in spec.get('regex', ()):
+                try:
+                    self.regexes.append((rule.id, re.compile(pattern, re.IGNORECASE)))
+                except re.error as e:
+                    raise ValueError(f"Rule {rule.id}: bad regex {pattern!r}: {e}")
+            for pattern in spec.get('paths', ()):
+                normalized = normalize_path(pattern)
+                literals = glob_literals(normalized)
+                path_literals.extend((literal, len(self.globs)) for literal in literals)
+                if not literals:
+                    self.unindexed_globs.append(len(self.globs))
+                self.glob_literal_counts.append(len(literals))
+                self.globs.append((rule.id, re.compile(fnmatch.translate(normalized))))
+            for event_id in spec.get('event_ids', ()):
+                self.event_ids.setdefault(int(event_id), []).append(rule.id)
+
+        self.unindexed_regexes = []
+        for index, (_, regex) in enumerate(self.regexes):
+            literal = regex_literal(regex.pattern)
+            if literal:
+                text_literals.append((literal, ('regex', index)))
+            else:
+                self.unindexed_regexes.append(index)
+        patterns = [f"(?:{self.regexes[index][1].pattern})" for index in self.unindexed_regexes]
+        self.regex_filter = re.compile('|'.join(patterns), re.IGNORECASE) if patterns else None
+
+        self.text_index = LiteralIndex(text_literals)
+        self.path_index = LiteralIndex(path_literals)
+        self.scored = 0
+        self.matched = 0
+
+    @classmethod
+    def load(cls, path):
+        """Rules from a JSON file: {"rules": [{"id", "description", "score", "severity", "types",
+        "keywords", "regex", "paths", "event_ids"}, ...]}"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f).get('rules', []))
+
+    def __len__(self):
+        return len(self.rules)
+
+    def match(self, log):
+        """Ids of the rules log matches"""
+        event = log.get('Event', '')
+        details = log.get('Details', '')
+        hits = set()
+
+        text = f"{event}\n{details}".lower()
+        regex_candidates = []
+        for kind, value in self.text_index.find(text):
+            if kind == 'rule':
+                hits.add(value)
+            else:
+                regex_candidates.append(value)
+        if self.regex_filter is not None and self.regex_filter.search(text):
+            regex_candidates.extend(self.unindexed_regexes)
+        for index in regex_candidates:
+            rule_id, regex = self.regexes[index]
+            if rule_id not in hits and regex.search(text):
+                hits.add(rule_id)
+
+        if self.globs:
+            paths = PATH_LINE.findall(details)
+            if log.get('FilePath'):
+                paths.append(log['FilePath'])
+            for path in paths:
+                normalized = normalize_path(path)
+                # A glob is a candidate once every one of its literals is in the path
+                found = Counter(index for literal in self.path_index.literals(normalized)
+                                for index in self.path_index.payloads[literal])
+                candidates = [index for index, count in found.items() if count == self.glob_literal_counts[index]]
+                for index in candidates + self.unindexed_globs:
+                    rule_id, glob = self.globs[index]
+                    if rule_id not in hits and glob.match(normalized):
+                        hits.add(rule_id)
+
+        if self.event_ids:
+            found = EVENT_ID.search(event) or EVENT_ID.search(details)
+            if found:
+                hits.update(self.event_ids.get(int(found.group(1)), ()))
+
+        if not hits:
+            return []
+        type_name = log.get('Type')
+        return sorted(rule_id for rule_id in hits
+                      if self.rules[rule_id].types is None or type_name in self.rules[rule_id].types)
+
+    def apply(self, logs):
+        """Score each entry in place and return how many matched a rule"""
+        matched = 0
+        for log in logs:
+            rule_ids = self.match(log)
+            if not rule_ids:
+                continue
+            matched += 1
+            rules = [self.rules[rule_id] for rule_id in rule_ids]
+            log['Rules'] = ','.join(rule_ids)
+            log['Score'] = sum(rule.score for rule in rules)
+            severity = log.get('Severity', 'Info')
+            for rule in rules:
+                if rule.severity and SEVERITY_RANK[rule.severity] > SEVERITY_RANK.get(severity, 0):
+                    severity = rule.severity
+            log['Severity'] = severity
+        self.scored += len(logs)
+        self.matched += matched
+        return matched
+
+    def describe(self, rule_id):
+        rule = self.rules.get(rule_id)
+        if rule is None:
+            return rule_id
+        return f"{rule.id} (+{rule.score}): {rule.description}" if rule.description else f"{rule.id} (+{rule.score})"
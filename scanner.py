@@ -0,0 +1,162 @@
+"""Stat-cache scanner: added, removed and modified files under a set of folders"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# DirEntry.inode() is free from readdir on POSIX but costs a stat call per file on Windows
+USE_INODES = os.name != 'nt'
+
+
+def scan_directory(directory, previous, verify):
+    """List one directory against its previous state
+
+    previous is (mtime_ns, {name: (size, mtime_ns, inode)}, subdirectory names)
+    or None. A directory whose own mtime is unchanged has had nothing
+    added, removed or renamed, so unless verify is set its cached state is
+    reused without listing it. Returns (state, changes, subdirectories);
+    state is None if the directory is gone.
+    """
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except FileNotFoundError:
+        return None, [], []
+    except OSError:
+        mtime = None  # Unreadable: keep what we knew
+    if previous is not None and (mtime is None or (mtime == previous[0] and not verify)):
+        return previous, [], [os.path.join(directory, name) for name in previous[2]]
+    if mtime is None:
+        return None, [], []
+
+    files = {}
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                    files[entry.name] = (st.st_size, st.st_mtime_ns, entry.inode() if USE_INODES else 0)
+                except OSError:
+                    continue
+    except OSError:
+        if previous is not None:
+            return previous, [], [os.path.join(directory, name) for name in previous[2]]
+        return None, [], []
+
+    changes = []
+    old_files = previous[1] if previous is not None else {}
+    for name, stat in files.items():
+        old = old_files.get(name)
+        if old is None:
+            changes.append(('added', os.path.join(directory, name), stat[0], stat[1]))
+        elif old != stat:
+            changes.append(('modified', os.path.join(directory, name), stat[0], stat[1]))
+    for name, old in old_files.items():
+        if name not in files:
+            changes.append(('removed', os.path.join(directory, name), old[0], old[1]))
+    return (mtime, files, tuple(subdirs)), changes, [os.path.join(directory, name) for name in subdirs]
+
+
+class StatCacheScanner:
+    """Walk folders with scandir on worker threads, diffing against a persisted snapshot
+
+    The snapshot holds (size, mtime, inode) per file, grouped by directory
+    with the directory's own mtime. Directories with an unchanged mtime
+    are not listed again; since a file rewritten in place leaves its
+    directory's mtime alone, every verify_every-th scan (and the first one
+    after starting) lists everything. The first scan without a snapshot is
+    a baseline and only reports files modified in the last baseline_window
+    seconds. scan() leaves the new snapshot pending; commit() adopts and
+    saves it once the changes are stored.
+    """
+
+    def __init__(self, roots, path=None, workers=4, verify_every=10, baseline_window=3600):
+        self.roots = list(roots)
+        self.path = path
+        self.workers = workers
+        self.verify_every = verify_every
+        self.baseline_window = baseline_window
+        self.snapshot = self.load()
+        self.pending = None
+        self.scans = 0
+        self.stats = {}
+
+    def load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            return {directory: (mtime, {name: tuple(stat) for name, stat in files.items()}, tuple(subdirs))
+                    for directory, (mtime, files, subdirs) in data.items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def scan(self, cancel=None):
+        """Return (kind, path, size, mtime_ns) for each file added, removed or modified since the snapshot"""
+        start = time.perf_counter()
+        previous = self.snapshot
+        baseline = not previous
+        verify = self.scans % self.verify_every == 0
+        current = {}
+        changes = []
+        listed = skipped = 0
+        cancelled = False
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scanner') as pool:
+            pending = {pool.submit(scan_directory, root, previous.get(root), verify): root
+                       for root in self.roots if os.path.isdir(root)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory = pending.pop(future)
+                    state, found, subdirs = future.result()
+                    if state is None:
+                        continue
+                    current[directory] = state
+                    changes.extend(found)
+                    if state is previous.get(directory):
+                        skipped += 1
+                    else:
+                        listed += 1
+                    for subdir in subdirs:
+                        pending[pool.submit(scan_directory, subdir, previous.get(subdir), verify)] = subdir
+                if cancel is not None and cancel.is_set():
+                    cancelled = True
+                    for future in pending:
+                        future.cancel()
+                    break
+
+        if not cancelled:
+            # Directories no longer reachable took all their files with them
+            for directory, (_, files, _) in previous.items():
+                if directory not in current:
+                    changes.extend(('removed', os.path.join(directory, name), stat[0], stat[1])
+                                   for name, stat in files.items())
+        if baseline:
+            cutoff = (time.time() - self.baseline_window) * 1e9
+            changes = [('modified', path, size, mtime) for _, path, size, mtime in changes if mtime > cutoff]
+
+        self.pending = None if cancelled else current
+        self.scans += 1
+        self.stats = {'directories_listed': listed, 'directories_skipped': skipped,
+                      'files': sum(len(files) for _, files, _ in current.values()),
+                      'changes': len(changes), 'seconds': round(time.perf_counter() - start, 4)}
+        return changes
+
+    def commit(self):
+        """Adopt the last scan's snapshot and save it"""
+        if self.pending is None:
+            return
+        self.snapshot = self.pending
+        self.pending = None
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot, f, separators=(',', ':'))
+        os.replace(temp_path, self.path)
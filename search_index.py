@@ -0,0 +1,186 @@
+"""Incremental trigram index behind the live search box"""
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import chain
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Trigram postings over Event/Details plus per-code postings for Type/Source
+
+    The index follows an EventStore: update() indexes whatever was appended
+    since the last call, so ingest paths only pay for their own events. It
+    works slice_events at a time, releasing the index and store locks
+    between slices, so a large backlog (a journal restore) never holds up
+    another thread for more than one slice. search() narrows a query to
+    candidate ids before verifying substrings, scans events not indexed yet
+    directly, and reuses the previous result when the new query extends
+    the old one.
+    """
+
+    def __init__(self, store, max_indexed_chars=1024, slice_events=2_000):
+        self.store = store
+        self.max_indexed_chars = max_indexed_chars
+        self.slice_events = slice_events
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.postings = {}  # trigram -> array of ids, ascending
+        self.source_postings = {}  # source code -> array of ids
+        self.type_postings = {}  # type code -> array of ids
+        self.long_ids = array('q')  # Text cut at max_indexed_chars, always verified
+        self.indexed_base = self.store.base_id
+        self.indexed_upto = self.store.base_id
+        self._last_query = None
+        self._last_result = None
+        self._last_upto = None
+
+    def update(self, blocking=True):
+        """Index events appended to the store since the last call; returns True once caught up
+
+        With blocking=False (the UI thread) it indexes at most one slice, and
+        none if another thread is indexing: that thread picks up the new
+        events too, and search() scans whatever is left meanwhile.
+        """
+        while True:
+            if not self.lock.acquire(blocking):
+                return False
+            try:
+                caught_up = self._update(self.slice_events)
+            finally:
+                self.lock.release()
+            if caught_up or not blocking:
+                return caught_up
+
+    def _update(self, limit=None):
+        """Index at most limit of the events not indexed yet; returns True if none are left"""
+        store = self.store
+        with store.lock:
+            if store.base_id != self.indexed_base and store.base_id >= self.indexed_upto:
+                # Store was cleared: nothing we hold is reachable any more
+                self._reset()
+            elif store.base_id - self.indexed_base > len(store):
+                # Mostly evicted ids in the postings now, prune them
+                self._compact(store.base_id)
+            start = max(self.indexed_upto, store.base_id)
+            end = store.next_id if limit is None else min(store.next_id, start + limit)
+            caught_up = end == store.next_id
+            base = store.base_id
+            rows = [(event_id, store.events[event_id - base], store.details[event_id - base],
+                     store.source_codes[event_id - base], store.type_codes[event_id - base])
+                    for event_id in range(start, end)]
+
+        postings = self.postings
+        limit = self.max_indexed_chars
+        for event_id, event, details, source_code, type_code in rows:
+            text = f"{event}\n{details}".lower()
+            if len(text) > limit:
+                text = text[:limit]
+                self.long_ids.append(event_id)
+            for gram in trigrams(text):
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = array('q')
+                ids.append(event_id)
+            self.source_postings.setdefault(source_code, array('q')).append(event_id)
+            self.type_postings.setdefault(type_code, array('q')).append(event_id)
+        self.indexed_upto = end
+        return caught_up
+
+    def _compact(self, first_id):
+        for table in (self.postings, self.source_postings, self.type_postings):
+            for key in list(table):
+                ids = table[key]
+                kept = ids[bisect_left(ids, first_id):]
+                if kept:
+                    table[key] = kept
+                else:
+                    del table[key]
+        self.long_ids = self.long_ids[bisect_left(self.long_ids, first_id):]
+        self.indexed_base = first_id
+
+    def search(self, query):
+        """Return the set of ids whose Event, Details, Type or Source contains query"""
+        query = query.lower()
+        with self.lock:
+            self._update(self.slice_events)
+            store = self.store
+            if not query:
+                return set(store.ids())
+
+            refining = (self._last_query is not None and self._last_query in query
+                        and self._last_upto is not None and self._last_upto >= store.base_id)
+            if refining:
+                candidates = set(self._last_result)
+                candidates.update(range(self._last_upto, self.indexed_upto))
+            elif len(query) >= 3:
+                candidates = self._trigram_candidates(query)
+            else:
+                candidates = None  # Too short for trigrams: verify everything
+
+            result = self._verify(query, candidates)
+            self._last_query = query
+            self._last_result = result
+            self._last_upto = self.indexed_upto
+            return set(result)
+
+    def _trigram_candidates(self, query):
+        lists = []
+        for gram in trigrams(query):
+            ids = self.postings.get(gram)
+            if ids is None:
+                lists = []
+                break
+            lists.append(ids)
+
+        candidates = set()
+        if lists:
+            lists.sort(key=len)
+            candidates = set(lists[0])
+            for ids in lists[1:]:
+                candidates.intersection_update(ids)
+                if not candidates:
+                    break
+        candidates.update(self.long_ids)
+        return candidates
+
+    def _verify(self, query, candidates):
+        store = self.store
+        matching_sources = store.sources.match(lambda value: query in value.lower())
+        matching_types = store.types.match(lambda value: query in value.lower())
+
+        result = set()
+        for code in matching_sources:
+            result.update(self.source_postings.get(code, ()))
+        for code in matching_types:
+            result.update(self.type_postings.get(code, ()))
+
+        with store.lock:
+            base = store.base_id
+            end = store.next_id
+            events = store.events
+            details = store.details
+            # Events not indexed yet (a backlog still being worked off) are all candidates
+            unindexed = range(max(self.indexed_upto, base), end)
+            if candidates is None:
+                candidates = range(base, end)
+            else:
+                candidates = chain(candidates, unindexed)
+            for event_id in candidates:
+                if event_id < base or event_id >= end or event_id in result:
+                    continue
+                row = event_id - base
+                if query in events[row].lower() or query in details[row].lower():
+                    result.add(event_id)
+            if matching_sources or matching_types:
+                for event_id in unindexed:
+                    row = event_id - base
+                    if store.source_codes[row] in matching_sources or store.type_codes[row] in matching_types:
+                        result.add(event_id)
+            result = {event_id for event_id in result if event_id >= base}
+        return result
@@ -0,0 +1 @@
+"""Synthetic events, platform stubs and reference matchers shared by tests/ and benchmarks/"""
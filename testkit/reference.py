@@ -0,0 +1,36 @@
+"""Straightforward versions of the indexed matchers, to check them against and time them by"""
+import fnmatch
+import re
+
+from blocklist import signatures
+from ingest import normalize_path
+from rules import EVENT_ID, PATH_LINE
+
+
+def naive_match(specs, log):
+    """Each rule checked on its own, as the old keyword loop did"""
+    text = f"{log.get('Event', '')}\n{log.get('Details', '')}".lower()
+    paths = [normalize_path(path) for path in PATH_LINE.findall(log.get('Details', ''))]
+    if log.get('FilePath'):
+        paths.append(normalize_path(log['FilePath']))
+    found = EVENT_ID.search(log.get('Event', '')) or EVENT_ID.search(log.get('Details', ''))
+    event_id = int(found.group(1)) if found else None
+    hits = []
+    for spec in specs:
+        if (any(keyword.lower() in text for keyword in spec.get('keywords', ()))
+                or any(re.search(pattern, text, re.IGNORECASE) for pattern in spec.get('regex', ()))
+                or any(fnmatch.fnmatchcase(path, normalize_path(glob)) for glob in spec.get('paths', ())
+                       for path in paths)
+                or event_id in spec.get('event_ids', ())):
+            if not spec.get('types') or log.get('Type') in spec['types']:
+                hits.append(spec['id'])
+    return sorted(hits)
+
+
+def linear_check(entries, log):
+    """Every entry compared with every signature of log, as a list of blocked items would be"""
+    for signature in signatures(log):
+        for blocked, action in entries:
+            if blocked == signature:
+                return signature, action
+    return None
@@ -0,0 +1,234 @@
+"""Stand-ins for the Windows APIs and collectors, so the service runs on any platform
+
+install_platform_stubs() registers fake win32evtlog / win32evtlogutil /
+win32con / winreg / psutil modules, so the real collector code runs
+against synthetic data. stub_sources() replaces the collectors outright
+with fast synthetic ones for pure ingest measurements. FakeEventLog is a
+growing event log for EventLogReader, and DigestRecorder an on_digest
+callback for HashingPool that can be waited on.
+"""
+import builtins
+import datetime
+import sys
+import threading
+import types
+from collections import namedtuple
+
+import service
+from testkit.synthetic import EventGenerator
+
+
+EventRecord = namedtuple('EventRecord', 'RecordNumber TimeGenerated EventID EventType')
+Address = namedtuple('Address', 'ip port')
+Connection = namedtuple('Connection', 'status laddr raddr pid')
+Partition = namedtuple('Partition', 'device mountpoint fstype')
+Usage = namedtuple('Usage', 'total used free percent')
+
+STUBBED_MODULES = ('win32evtlog', 'win32evtlogutil', 'win32con', 'winreg', 'psutil')
+
+
+class FakeProcess:
+    def __init__(self, info):
+        self.info = info
+
+    def as_dict(self, attrs=None, ad_value=None):
+        return {name: self.info.get(name, ad_value) for name in attrs or self.info}
+
+    def create_time(self):
+        return self.info['create_time']
+
+
+class FakeEventLog:
+    """Event log source (see collectors.Win32EventLogSource) whose records can be appended and cleared"""
+
+    def __init__(self, seed=1, page_size=1000):
+        self.rng = EventGenerator(seed).rng
+        self.page_size = page_size
+        self.records = []  # Oldest first
+        self.next_number = 1
+        self.opened = 0
+
+    def append(self, count, when=None):
+        when = when or datetime.datetime.now()
+        for _ in range(count):
+            self.records.append(EventRecord(self.next_number, when, self.rng.choice([4624, 4625, 4663, 4688]),
+                                            self.rng.choice([0x0001, 0x0008, 0x0010])))
+            self.next_number += 1
+
+    def clear(self):
+        """Empty the log; numbering starts again from 1, as it does on Windows"""
+        self.records = []
+        self.next_number = 1
+
+    def open(self):
+        self.opened += 1
+
+    def bounds(self):
+        if not self.records:
+            return None, None
+        return self.records[0].RecordNumber, self.records[-1].RecordNumber
+
+    def pages(self, start=None):
+        if start is None:
+            for end in range(len(self.records), 0, -self.page_size):
+                yield self.records[max(0, end - self.page_size):end][::-1]
+            return
+        first = start - self.records[0].RecordNumber
+        for begin in range(max(0, first), len(self.records), self.page_size):
+            yield self.records[begin:begin + self.page_size]
+
+    def message(self, record):
+        return f"Fake event {record.RecordNumber}\nEvent ID: {record.EventID}"
+
+    def close(self):
+        pass
+
+
+def fake_win32(records):
+    """win32evtlog, win32evtlogutil and win32con over a fixed list of consecutively numbered records (newest first)"""
+    win32evtlog = types.ModuleType('win32evtlog')
+    win32evtlog.EVENTLOG_SEQUENTIAL_READ = 0x0001
+    win32evtlog.EVENTLOG_SEEK_READ = 0x0002
+    win32evtlog.EVENTLOG_FORWARDS_READ = 0x0004
+    win32evtlog.EVENTLOG_BACKWARDS_READ = 0x0008
+    ascending = records[::-1]
+    oldest = ascending[0].RecordNumber if ascending else 0
+
+    def read_event_log(handle, flags, offset):
+        if flags & win32evtlog.EVENTLOG_SEEK_READ:
+            handle['position'], handle['forwards'] = offset - oldest, True
+        source = ascending if handle['forwards'] else records
+        batch = source[handle['position']:handle['position'] + 1000]
+        handle['position'] += len(batch)
+        return batch
+
+    win32evtlog.OpenEventLog = lambda server, log_type: {'log': log_type, 'position': 0, 'forwards': False}
+    win32evtlog.GetNumberOfEventLogRecords = lambda handle: len(records)
+    win32evtlog.GetOldestEventLogRecord = lambda handle: oldest
+    win32evtlog.ReadEventLog = read_event_log
+    win32evtlog.CloseEventLog = lambda handle: None
+
+    win32evtlogutil = types.ModuleType('win32evtlogutil')
+    win32evtlogutil.SafeFormatMessage = lambda event, log_type: (
+        f"An attempt was made to access an object.\nEvent ID: {event.EventID}\n"
+        f"Accesses: {'Delete' if event.EventID == 4663 else 'ReadData'}")
+
+    win32con = types.ModuleType('win32con')
+    win32con.EVENTLOG_ERROR_TYPE = 0x0001
+    win32con.EVENTLOG_AUDIT_FAILURE = 0x0010
+    return win32evtlog, win32evtlogutil, win32con
+
+
+def fake_winreg(values):
+    """winreg whose Run keys all hold the same (name, value) pairs"""
+    winreg = types.ModuleType('winreg')
+    winreg.HKEY_CURRENT_USER = 0x80000001
+    winreg.HKEY_LOCAL_MACHINE = 0x80000002
+    winreg.KEY_READ = 0x20019
+
+    def enum_value(key, index):
+        if index >= len(values):
+            raise OSError("No more data is available")
+        name, value = values[index]
+        return name, value, 1
+
+    winreg.OpenKey = lambda hive, location, reserved=0, access=0: (hive, location)
+    winreg.EnumValue = enum_value
+    winreg.CloseKey = lambda key: None
+    return winreg
+
+
+def fake_psutil(processes, connections):
+    """psutil over FakeProcesses; callers start and end processes by editing psutil.table (pid -> process)"""
+    psutil = types.ModuleType('psutil')
+    psutil.table = {proc.info['pid']: proc for proc in processes}
+
+    class NoSuchProcess(Exception):
+        pass
+
+    def process(pid=None):
+        if pid not in psutil.table:
+            raise NoSuchProcess(pid)
+        return psutil.table[pid]
+
+    psutil.NoSuchProcess = NoSuchProcess
+    psutil.Process = process
+    psutil.pids = lambda: list(psutil.table)
+    psutil.process_iter = lambda attrs=None: iter(list(psutil.table.values()))
+    psutil.net_connections = lambda kind='inet': list(connections)
+    psutil.disk_partitions = lambda: [Partition('C:\\', 'C:\\', 'NTFS'), Partition('D:\\', 'D:\\', 'NTFS')]
+    psutil.disk_usage = lambda mountpoint: Usage(511_000_000_000, 255_500_000_000, 255_500_000_000, 50.0)
+    return psutil
+
+
+def install_platform_stubs(seed=1, security_events=500, processes=300, connections=100, startup_entries=20):
+    """Register the fake platform modules and make the service import them"""
+    rng = EventGenerator(seed).rng
+    now = datetime.datetime.now()
+    records = [EventRecord(security_events - i, now - datetime.timedelta(seconds=i * 30),
+                           rng.choice([4624, 4625, 4663, 4688]), rng.choice([0x0001, 0x0008, 0x0010]))
+               for i in range(security_events)]
+    process_list = [FakeProcess({'pid': 100 + i, 'name': f"proc{i}.exe", 'username': 'SYSTEM',
+                                 'create_time': (now - datetime.timedelta(minutes=i)).timestamp()})
+                    for i in range(processes)]
+    connection_list = [Connection('ESTABLISHED', Address('10.0.0.5', 50000 + i),
+                                  Address(f"93.184.216.{i % 254 + 1}", 443), 100 + i % processes)
+                       for i in range(connections)]
+    startup_values = [(f"App{i}", f"C:\\Apps\\app{i}.exe --background") for i in range(startup_entries)]
+
+    modules = dict(zip(('win32evtlog', 'win32evtlogutil', 'win32con'), fake_win32(records)))
+    modules['winreg'] = fake_winreg(startup_values)
+    modules['psutil'] = fake_psutil(process_list, connection_list)
+    sys.modules.update(modules)
+    for name in STUBBED_MODULES:
+        service._optional_modules.pop(name, None)
+    if not hasattr(builtins, 'WindowsError'):
+        builtins.WindowsError = OSError  # Only defined on Windows; the registry collector catches it
+    return modules
+
+
+class DigestRecorder:
+    """on_digest callback recording results, with a wait for a number of them"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.results = {}  # event id -> (path, digest, previous)
+        self.calls = 0
+
+    def __call__(self, event_ids, path, digest, previous):
+        with self.condition:
+            for event_id in event_ids:
+                self.results[event_id] = (path, digest, previous)
+            self.calls += 1
+            self.condition.notify_all()
+
+    def wait(self, calls, timeout=120):
+        with self.condition:
+            return self.condition.wait_for(lambda: self.calls >= calls, timeout)
+
+
+def stub_sources(generator=None, per_collector=1000):
+    """Collectors named like the system ones that return synthetic entries of their Source"""
+    generator = generator or EventGenerator()
+    sources_by_collector = {
+        'get_event_logs': {'Event Log'},
+        'get_processes': {'Process'},
+        'get_network_info': {'Network'},
+        'get_recent_files': {'File System'},
+        'get_startup_programs': {'System'},
+        'get_system_info_logs': {'System'},
+        'get_recent_deletions': {'Security Log'},
+        'get_file_system_changes': {'File System'},
+    }
+    pool = list(generator.entries(per_collector * len(sources_by_collector) * 2))
+
+    def make(name, wanted):
+        entries = [entry for entry in pool if entry['Source'] in wanted][:per_collector]
+
+        def collect(cancel=None, since=None):
+            return list(entries)
+
+        collect.__name__ = name
+        return collect
+
+    return [make(name, wanted) for name, wanted in sources_by_collector.items()]
@@ -0,0 +1,180 @@
+"""Seeded synthetic events covering every Source/Type the collectors produce, and rules and
+blocklist signatures to match them against"""
+import datetime
+import os
+import random
+
+from ingest import normalize_path
+
+
+# (Source, Type, weight): roughly the mix of a busy session
+CATALOGUE = [
+    ('File System', 'File Created', 14),
+    ('File System', 'File Modified', 22),
+    ('File System', 'File Deleted', 6),
+    ('File System', 'File Moved', 3),
+    ('File System', 'Recent File', 2),
+    ('File System', 'System File Modified', 1),
+    ('File System', 'System File Added', 1),
+    ('File System', 'System File Removed', 1),
+    ('Process', 'Running Process', 25),
+    ('Process', 'Process Started', 3),
+    ('Process', 'Process Exited', 3),
+    ('Network', 'Network Connection', 15),
+    ('Network', 'Connection Opened', 4),
+    ('Network', 'Connection Closed', 4),
+    ('Event Log', 'Security Event', 6),
+    ('Security Log', 'File Deletion', 1),
+    ('System', 'Startup Program', 2),
+    ('System', 'System Info', 1),
+    ('System', 'Disk Info', 1),
+    ('System', 'Error', 1),
+]
+
+FILE_EVENT_TYPES = {'File Created': 'created', 'File Modified': 'modified', 'File Deleted': 'deleted',
+                    'File Moved': 'moved'}
+
+
+class EventGenerator:
+    """Deterministic collector-shaped events spread evenly over the last span_hours
+
+    Strings repeat the way real sessions do (a few hundred processes, a
+    few thousand documents), so store and index memory is representative.
+    """
+
+    def __init__(self, seed=1, span_hours=12, now=None):
+        self.rng = random.Random(seed)
+        self.now = now or datetime.datetime.now()
+        self.span = datetime.timedelta(hours=span_hours)
+        home = os.path.join('C:\\', 'Users', 'me')
+        self.documents = [os.path.join(home, 'Documents', f"report_{i}.docx") for i in range(2000)]
+        self.downloads = [os.path.join(home, 'Downloads', f"setup_{i}.exe") for i in range(200)]
+        self.system_files = [os.path.join('C:\\', 'Windows', 'System32', f"driver_{i}.sys") for i in range(300)]
+        self.processes = [f"proc{i}.exe" for i in range(300)]
+        self.kinds = [(source, type_name) for source, type_name, _ in CATALOGUE]
+        self.weights = [weight for _, _, weight in CATALOGUE]
+
+    def entries(self, count):
+        """Yield count entries, oldest first, ending at now"""
+        start = self.now - self.span
+        step = self.span / max(1, count)
+        kinds = self.rng.choices(self.kinds, self.weights, k=count)
+        for i, (source, type_name) in enumerate(kinds):
+            yield self.entry(source, type_name, start + step * i)
+
+    def entry(self, source, type_name, when):
+        rng = self.rng
+        if type_name in FILE_EVENT_TYPES:
+            action = FILE_EVENT_TYPES[type_name]
+            path = rng.choice(self.documents if rng.random() < 0.8 else self.downloads)
+            if action == 'moved':
+                details = f"File moved from: {path}\nTo: {rng.choice(self.documents)}"
+            else:
+                details = f"Path: {path}"
+            return {'Time': when, 'Source': source, 'Type': type_name,
+                    'Event': f"File {action}: {os.path.basename(path)}", 'Details': details,
+                    'Severity': 'Medium' if action == 'deleted' else 'Low',
+                    'EventType': action, 'FilePath': path}
+        if type_name == 'Recent File':
+            path = rng.choice(self.downloads)
+            return {'Time': when, 'Source': source, 'Type': type_name,
+                    'Event': f"Recent file: {os.path.basename(path)}",
+                    'Details': f"Path: {path}\nModified: {when}", 'Severity': 'Low'}
+        if type_name.startswith('System File'):
+            path = rng.choice(self.system_files)
+            kind = type_name.split()[-1].lower()
+            return {'Time': when, 'Source': source, 'Type': type_name,
+                    'Event': f"System file {kind}: {os.path.basename(path)}",
+                    'Details': f"Path: {path}\nSize: {rng.randint(1, 5_000_000):,} bytes\nModified: {when}",
+                    'Severity': 'High'}
+        if source == 'Process':
+            name = rng.choice(self.processes)
+            pid = rng.randint(100, 60000)
+            verb = 'Process' if type_name == 'Running Process' else type_name.capitalize()
+            details = f"User: SYSTEM\nPID: {pid}\nName: {name}"
+            if type_name == 'Process Exited':
+                details += f"\nStarted: {when - datetime.timedelta(minutes=rng.randint(1, 600)):%Y-%m-%d %H:%M:%S}"
+            return {'Time': when, 'Source': source, 'Type': type_name,
+                    'Event': f"{verb}: {name} (PID: {pid})", 'Details': details, 'Severity': 'Low'}
+        if source == 'Network':
+            verb = 'Connection' if type_name == 'Network Connection' else type_name.capitalize()
+            details = f"Status: ESTABLISHED\nPID: {rng.randint(100, 60000)}\nFirst seen: {when:%Y-%m-%d %H:%M:%S}"
+            return {'Time': when, 'Source': source, 'Type': type_name,
+                    'Event': f"{verb}: 10.0.0.5:{rng.randint(1024, 65535)} -> 93.184.216.{rng.randint(1, 254)}:443",
+                    'Details': details, 'Severity': 'Low' if type_name == 'Connection Closed' else 'Medium'}
+        if type_name == 'Security Event':
+            event_id = rng.choice([4624, 4625, 4663, 4688, 4720])
+            return {'Time': when, 'Source': source, 'Type': type_name, 'Event': f"Event ID: {event_id}",
+                    'Details': f"An account was logged on.\nLogon Type: {rng.randint(2, 11)}",
+                    'Severity': 'High' if event_id == 4625 else 'Medium'}
+        if type_name == 'File Deletion':
+            return {'Time': when, 'Source': source, 'Type': type_name, 'Event': 'File deleted (Security Event)',
+                    'Details': f"Event ID: 4663\nObject: {rng.choice(self.documents)} Delete",
+                    'Severity': 'Medium'}
+        if type_name == 'Startup Program':
+            name = rng.choice(self.processes)
+            return {'Time': when, 'Source': source, 'Type': type_name, 'Event': f"Startup: {name}",
+                    'Details': f"Registry: Software\\Microsoft\\Windows\\CurrentVersion\\Run\nValue: C:\\Apps\\{name}",
+                    'Severity': 'Medium'}
+        if type_name == 'System Info':
+            return {'Time': when, 'Source': source, 'Type': type_name, 'Event': "System: Windows 10",
+                    'Details': "Node: DESKTOP\nVersion: 10.0.19045\nMachine: AMD64\nProcessor: x86", 'Severity': 'Info'}
+        if type_name == 'Disk Info':
+            return {'Time': when, 'Source': source, 'Type': type_name, 'Event': "Disk: C:\\ (C:\\)",
+                    'Details': f"Type: NTFS\nTotal: 511,000,000,000 bytes\nUsed: {rng.randint(10, 95)}%",
+                    'Severity': 'Info'}
+        return {'Time': when, 'Source': source, 'Type': type_name, 'Event': "Error occurred",
+                'Details': f"Collector failed: timeout after {rng.randint(1, 60)}s", 'Severity': 'High'}
+
+    def file_events(self, count):
+        """Yield (event_type, src, dest) raw watchdog-style events for log_file_event"""
+        rng = self.rng
+        for _ in range(count):
+            path = rng.choice(self.documents)
+            event_type = rng.choices(('created', 'modified', 'deleted', 'moved'), (3, 6, 1, 1))[0]
+            yield event_type, path, rng.choice(self.documents) if event_type == 'moved' else None
+
+
+def synthetic_rules(count, seed=1):
+    """count rules: mostly keywords, with some regexes, path globs and event IDs; a few hit the synthetic events"""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz0123456789_.'
+    specs = []
+    for i in range(count):
+        kind = rng.choices(('keywords', 'regex', 'paths', 'event_ids'), (80, 5, 10, 5))[0]
+        spec = {'id': f"R{i:05d}", 'score': rng.randint(1, 50)}
+        if kind == 'keywords':
+            words = [''.join(rng.choice(letters) for _ in range(rng.randint(5, 14))) for _ in range(rng.randint(1, 3))]
+            if i % 50 == 0:
+                words.append(f"report_{rng.randint(0, 1999)}")  # Real document names in the synthetic events
+            spec['keywords'] = words
+        elif kind == 'regex':
+            spec['regex'] = [f"{''.join(rng.choice('abcdefghij') for _ in range(4))}\\d{{2,}}"]
+        elif kind == 'paths':
+            spec['paths'] = [f"*/{rng.choice(['documents', 'downloads', 'temp'])}/*_{rng.randint(0, 2000)}.*"]
+        else:
+            spec['event_ids'] = [rng.choice([4624, 4625, 4663, 4688, 4720, rng.randint(1000, 9999)])]
+        specs.append(spec)
+    return specs
+
+
+def synthetic_signatures(count, generator, seed=1):
+    """count signatures, mostly for things the events never mention, plus a few they do"""
+    rng = random.Random(seed)
+    found = set()
+    while len(found) < count:
+        roll = rng.random()
+        if roll < 0.001:
+            found.add(f"path:{normalize_path(rng.choice(generator.documents))}")
+        elif roll < 0.002:
+            found.add(f"process:{rng.choice(generator.processes)}")
+        elif roll < 0.5:
+            found.add(f"path:c:/users/someone/appdata/local/temp/{rng.getrandbits(48):012x}.exe")
+        elif roll < 0.8:
+            found.add(f"remote:{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}."
+                      f"{rng.randint(1, 254)}:{rng.choice([80, 443, 4444, 8080])}")
+        elif roll < 0.95:
+            found.add(f"process:{rng.getrandbits(32):08x}.exe")
+        else:
+            found.add(f"event:{rng.randint(1000, 9999)}")
+    return sorted(found)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules (and the testkit helpers shared with the benchmarks) live at the top level
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
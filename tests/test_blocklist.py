@@ -0,0 +1,48 @@
+from blocklist import Blocklist, signatures
+from testkit.reference import linear_check
+from testkit.synthetic import EventGenerator, synthetic_signatures
+
+
+def test_lookups_agree_with_a_linear_scan():
+    generator = EventGenerator(1)
+    events = list(generator.entries(2000))
+    blocklist = Blocklist()
+    actions = ('flag', 'suppress')
+    blocklist.entries = {signature: {'action': actions[i % 2], 'added': 0, 'note': ''}
+                         for i, signature in enumerate(synthetic_signatures(5000, generator, 1))}
+    entries = [(signature, entry['action']) for signature, entry in blocklist.entries.items()]
+    results = [blocklist.check(log) for log in events]
+    assert results == [linear_check(entries, log) for log in events]
+    assert any(results)
+
+
+def test_flag_and_suppress_survive_a_reload(tmp_path):
+    events = list(EventGenerator(1).entries(5000))
+    path = str(tmp_path / 'blocklist.json')
+    blocklist = Blocklist(path)
+    flagged_file = next(log for log in events if log.get('FilePath'))
+    suppressed_process = next(log for log in events if log['Source'] == 'Process')
+    blocklist.add(signatures(flagged_file)[0], 'flag')
+    blocklist.add(signatures(suppressed_process)[0], 'suppress')
+
+    reloaded = Blocklist(path)
+    assert len(reloaded) == 2 and reloaded.entries == blocklist.entries
+
+    batch = [dict(log) for log in events]
+    kept = reloaded.apply(batch)
+    assert all(signatures(suppressed_process)[0] not in signatures(log) for log in kept)
+    flagged = [log for log in kept if 'Blocked' in log]
+    assert flagged and all(log['Severity'] in ('High', 'Critical') for log in flagged)
+    assert len(batch) - len(kept) == reloaded.suppressed > 0
+
+
+def test_removed_signatures_no_longer_match(tmp_path):
+    path = str(tmp_path / 'blocklist.json')
+    blocklist = Blocklist(path)
+    log = {'Source': 'File System', 'Type': 'File Created', 'Severity': 'Low', 'Event': 'File created',
+           'Details': 'Path: C:\\Temp\\x.exe', 'FilePath': 'C:\\Temp\\x.exe'}
+    signature = signatures(log)[0]
+    blocklist.add(signature, 'flag')
+    assert blocklist.check(log) == (signature, 'flag')
+    blocklist.remove(signature)
+    assert blocklist.check(log) is None and len(Blocklist(path)) == 0
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from collectors import CollectorRunner
+
+
+def run(runner, collectors):
+    results, errors = {}, {}
+    runner.run(collectors, results.__setitem__, errors.__setitem__)
+    return results, errors
+
+
+def test_timeout_sets_only_that_collectors_cancel_event():
+    seen = {}
+
+    def stuck(cancel):
+        seen['stuck'] = cancel
+        cancel.wait(5)
+        return ['late']
+
+    def steady(cancel):
+        seen['steady'] = cancel
+        time.sleep(0.3)
+        return ['entry'] if not cancel.is_set() else []
+
+    runner = CollectorRunner(max_workers=2)
+    start = time.monotonic()
+    results, errors = run(runner, [('stuck', stuck, 0.1), ('steady', steady, 5)])
+    assert results == {'steady': ['entry']}
+    assert isinstance(errors['stuck'], TimeoutError)
+    assert seen['stuck'].is_set() and not seen['steady'].is_set()
+    assert time.monotonic() - start < 2
+    runner.shutdown()
+
+
+def test_timed_out_collector_frees_its_worker():
+    released = threading.Event()
+
+    def cooperative(cancel):
+        cancel.wait(5)
+        released.set()
+        return []
+
+    runner = CollectorRunner(max_workers=1)
+    run(runner, [('slow', cooperative, 0.1)])
+    assert released.wait(1)
+    results, errors = run(runner, [('next', lambda cancel: ['x'], 1)])
+    assert results == {'next': ['x']} and not errors
+    runner.shutdown()
+
+
+def test_deadline_starts_when_the_collector_runs():
+    def first(cancel):
+        time.sleep(0.4)
+        return ['a']
+
+    def second(cancel):
+        time.sleep(0.1)
+        return ['b']
+
+    # One worker: second waits 0.4s in the queue, longer than its own 0.3s timeout
+    runner = CollectorRunner(max_workers=1)
+    results, errors = run(runner, [('first', first, 1), ('second', second, 0.3)])
+    assert results == {'first': ['a'], 'second': ['b']} and not errors
+    runner.shutdown()
+
+
+def test_collector_that_never_gets_a_worker_is_dropped():
+    def hog(cancel):
+        time.sleep(0.5)  # Ignores cancel
+        return []
+
+    runner = CollectorRunner(max_workers=1, max_queue_wait=0.2)
+    results, errors = run(runner, [('hog', hog, 0.1), ('starved', lambda cancel: ['x'], 1)])
+    assert 'starved' not in results
+    assert 'did not start' in str(errors['starved'])
+    runner.shutdown()
@@ -0,0 +1,127 @@
+import sys
+import threading
+import time
+
+import service
+from collectors import BookmarkStore, EventLogReader
+from testkit.stubs import FakeEventLog, fake_win32
+
+KEY = 'get_event_logs:Security'
+
+
+def numbers(records):
+    return [record.RecordNumber for record in records]
+
+
+def read_all(reader, cancel=None):
+    """Read a batch and mark every record handled, then commit"""
+    records = reader.read(cancel)
+    for record in records:
+        reader.mark(record)
+    reader.commit()
+    return records
+
+
+def test_backfills_then_reads_only_new_records(tmp_path):
+    log = FakeEventLog(page_size=7)
+    log.append(60)
+    reader = EventLogReader(log, BookmarkStore(str(tmp_path / 'bookmarks.json')), KEY, backfill=20)
+    assert numbers(read_all(reader)) == list(range(41, 61))
+
+    log.append(25)
+    assert numbers(read_all(reader)) == list(range(61, 86))
+    assert read_all(reader) == []
+
+
+def test_uncommitted_read_is_repeated_and_bookmark_survives_restart(tmp_path):
+    path = str(tmp_path / 'bookmarks.json')
+    log = FakeEventLog(page_size=7)
+    log.append(10)
+    reader = EventLogReader(log, BookmarkStore(path), KEY, backfill=20)
+    read_all(reader)
+
+    log.append(3)
+    assert len(reader.read()) == 3
+    assert len(reader.read()) == 3
+
+    restarted = EventLogReader(log, BookmarkStore(path), KEY, backfill=20)
+    assert numbers(read_all(restarted)) == [11, 12, 13]
+    assert restarted.read() == []
+
+
+def test_backlog_is_read_in_batches_with_partial_progress(tmp_path):
+    log = FakeEventLog(page_size=7)
+    log.append(5)
+    reader = EventLogReader(log, BookmarkStore(str(tmp_path / 'bookmarks.json')), KEY, backfill=5, max_records=40)
+    read_all(reader)
+
+    log.append(100)  # Downtime
+    batch = reader.read()
+    assert numbers(batch) == list(range(6, 46))
+    # Only part of the batch was handled before time ran out
+    for record in batch[:15]:
+        reader.mark(record)
+    reader.commit()
+    assert numbers(read_all(reader)) == list(range(21, 61))
+    assert numbers(read_all(reader)) == list(range(61, 101))
+    assert numbers(read_all(reader)) == list(range(101, 106))
+
+
+def test_cancel_stops_between_pages(tmp_path):
+    log = FakeEventLog(page_size=7)
+    log.append(5)
+    reader = EventLogReader(log, BookmarkStore(str(tmp_path / 'bookmarks.json')), KEY, backfill=5, max_records=1000)
+    read_all(reader)
+    log.append(100)
+    cancel = threading.Event()
+    cancel.set()
+    assert numbers(reader.read(cancel)) == list(range(6, 13))  # One page
+
+
+def test_cleared_log_falls_back_to_backfill(tmp_path):
+    log = FakeEventLog(page_size=7)
+    log.append(60)
+    reader = EventLogReader(log, BookmarkStore(str(tmp_path / 'bookmarks.json')), KEY, backfill=20)
+    read_all(reader)
+    log.clear()
+    log.append(10)
+    assert numbers(read_all(reader)) == list(range(1, 11))
+
+
+class SlowLog(FakeEventLog):
+    """Formatting each message takes a while, as SafeFormatMessage can"""
+
+    def message(self, record):
+        time.sleep(0.002)
+        return super().message(record)
+
+
+def monitor_source(cancel=None, since=None):
+    return []
+
+
+def test_service_formats_within_its_time_share_and_commits_progress(tmp_path, monkeypatch):
+    win32evtlog, win32evtlogutil, win32con = fake_win32([])
+    monkeypatch.setitem(sys.modules, 'win32con', win32con)
+    monkeypatch.setitem(service._optional_modules, 'win32evtlog', win32evtlog)
+    monkeypatch.setitem(service.COLLECTOR_TIMEOUTS, 'get_event_logs', 0.2)
+
+    monitor = service.MonitorService(journal_dir=str(tmp_path / 'journal'), sources=[monitor_source])
+    log = SlowLog(page_size=100)
+    log.append(5)
+    reader = EventLogReader(log, monitor.bookmarks, KEY, backfill=5)
+    monitor.cursors['get_event_logs'] = reader
+    monitor.on_collector_result('get_event_logs', monitor.get_event_logs())
+
+    log.append(1000)
+    start = time.monotonic()
+    logs = monitor.get_event_logs(cancel=threading.Event())
+    assert time.monotonic() - start < 0.5
+    assert 0 < len(logs) < 1000
+    monitor.on_collector_result('get_event_logs', logs)
+    assert monitor.bookmarks.get(KEY) == 5 + len(logs)
+
+    # The next refresh carries on where that one stopped
+    more = monitor.get_event_logs()
+    assert more and more[0]['Details'].startswith(f"Fake event {6 + len(logs)}\n")
+    monitor.close()
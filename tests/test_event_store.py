@@ -0,0 +1,37 @@
+import datetime
+import random
+
+import event_store
+from event_store import EventStore
+
+
+def shuffled_store(count, seed=1):
+    """Events ingested out of time order, with plenty of equal timestamps"""
+    rng = random.Random(seed)
+    base = datetime.datetime(2024, 1, 1)
+    store = EventStore()
+    store.extend([{'Time': base + datetime.timedelta(seconds=rng.randint(0, count // 4)), 'Source': 'System',
+                   'Type': 'Info', 'Event': f"e{i}", 'Details': '', 'Severity': 'Low'} for i in range(count)],
+                 record=False)
+    return store
+
+
+def expected_order(store, ids):
+    return sorted(ids, key=lambda event_id: (store.time_of(event_id), event_id))
+
+
+def test_small_and_large_subsets_are_ordered_the_same_way(monkeypatch):
+    store = shuffled_store(4000)
+    rng = random.Random(2)
+    for size in (0, 1, 50, 150, 1000, 3000):
+        ids = set(rng.sample(range(4000), size))
+        for fraction in (0.0, 1.0):  # Always walk the index, always sort
+            monkeypatch.setattr(event_store, 'SORT_SUBSET_FRACTION', fraction)
+            assert list(store.in_time_order(ids)) == expected_order(store, ids)
+
+
+def test_whole_store_and_evicted_ids():
+    store = shuffled_store(1000)
+    assert list(store.in_time_order(store.ids())) == expected_order(store, range(1000))
+    store.evict(100)
+    assert list(store.in_time_order({5, 150, 99, 700})) == expected_order(store, [150, 700])
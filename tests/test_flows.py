@@ -0,0 +1,60 @@
+import time
+
+from flows import Flow, FlowTable
+from ingest import BoundedEventQueue, QueueDrainer
+from service import MonitorService
+from testkit.stubs import Address, Connection, fake_psutil
+
+
+def connection(i, status='ESTABLISHED'):
+    remote = Address(f"93.184.{i // 254 % 254}.{i % 254 + 1}", 443)
+    return Connection(status, Address('10.0.0.5', 20000 + i % 40000), remote, 100 + i % 300)
+
+
+def baseline(count=50, **options):
+    connections = [connection(i) for i in range(count)] + [connection(1000, 'LISTEN')]
+    table = FlowTable(fake_psutil([], connections), **options)
+    assert table.poll(now=0) == ([], [])
+    return connections, table
+
+
+def test_baseline_keeps_only_established_connections():
+    _, table = baseline()
+    assert len(table) == 50
+
+
+def test_flows_close_only_after_going_unseen_for_close_after():
+    connections, table = baseline(close_after=10, max_flows=60)
+    del connections[:5]
+    connections.extend(connection(i) for i in range(100, 103))
+    opened, closed = table.poll(now=1)
+    assert len(opened) == 3 and closed == []
+
+    opened, closed = table.poll(now=12)
+    assert opened == [] and len(closed) == 5
+    assert all(flow.first_seen == 0 and flow.last_seen == 0 for flow in closed)
+    assert len(table) == 48
+
+
+def test_least_recently_seen_flows_are_evicted_past_max_flows():
+    connections, table = baseline(close_after=10, max_flows=60)
+    connections.extend(connection(i) for i in range(200, 220))
+    opened, closed = table.poll(now=1)
+    assert len(opened) == 20 and len(closed) == 10
+    assert len(table) == 60 and table.evicted == 10
+    assert sum(host['flows'] for host in table.by_remote().values()) == 60
+
+
+def test_closed_flows_do_not_inflate_queue_lag(tmp_path):
+    now = time.time()
+    flow = Flow(('10.0.0.5', 20000), ('93.184.216.34', 443), 100, 'ESTABLISHED', now - 60)
+    flow.last_seen = now - 20  # Closed after going unseen for close_after
+    monitor = MonitorService(journal_dir=str(tmp_path))
+    events = BoundedEventQueue(100)
+    for entry in monitor.flow_entries(closed=[flow]):
+        events.put(entry)
+    monitor.close()
+    assert events.oldest_age() < 1
+    drainer = QueueDrainer(events)
+    assert len(drainer.drain()) == 1
+    assert drainer.lag < 1
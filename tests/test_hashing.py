@@ -0,0 +1,63 @@
+import os
+
+from hashing import HashingPool, file_digest
+from testkit.stubs import DigestRecorder
+
+
+def write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def test_touch_is_unchanged_and_an_append_is_a_change(tmp_path):
+    collector = DigestRecorder()
+    pool = HashingPool(collector, workers=2, max_bytes=1 << 20, chunk_size=4096, cache_size=2)
+    path = str(tmp_path / 'check.txt')
+    write(path, b'first version' * 1000)
+    pool.submit(1, path)
+    assert collector.wait(1)
+    assert collector.results[1] == (path, file_digest(path), None)
+
+    # A touch changes the mtime but not the content
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    pool.submit(2, path)
+    assert collector.wait(2)
+    assert collector.results[2][1] == collector.results[2][2] and pool.hashed == 2
+
+    with open(path, 'ab') as f:
+        f.write(b'appended')
+    pool.submit(3, path)
+    assert collector.wait(3)
+    assert collector.results[3][1] != collector.results[3][2] == collector.results[2][1]
+
+    # Unchanged: served from the cache without reading
+    pool.submit(4, path)
+    assert collector.wait(4)
+    assert pool.hashed == 3 and pool.cache.hits == 1 and len(pool.cache) == 2
+    pool.shutdown(wait=True)
+
+
+def test_unchanged_files_are_served_from_the_cache(tmp_path):
+    collector = DigestRecorder()
+    pool = HashingPool(collector, workers=2, cache_size=20)
+    paths = [str(tmp_path / f"file_{i}.bin") for i in range(20)]
+    for i, path in enumerate(paths):
+        write(path, i.to_bytes(4, 'little') * 1024)
+    for round_ in range(2):
+        for i, path in enumerate(paths):
+            pool.submit(round_ * len(paths) + i, path)
+        assert collector.wait((round_ + 1) * len(paths))
+    pool.shutdown(wait=True)
+    assert pool.hashed == 20 and pool.cache.hits == 20
+
+
+def test_large_and_missing_files_are_not_reported(tmp_path):
+    collector = DigestRecorder()
+    pool = HashingPool(collector, workers=2, max_bytes=1 << 20)
+    big = str(tmp_path / 'big.bin')
+    write(big, b'\0' * (2 << 20))
+    pool.submit(5, big)
+    pool.submit(6, str(tmp_path / 'missing.txt'))
+    pool.shutdown(wait=True)
+    assert pool.too_large == 1 and pool.failed == 1 and collector.results == {}
@@ -0,0 +1,207 @@
+import queue
+
+import pytest
+
+from ingest import BoundedEventQueue, EventCoalescer, PathFilter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def coalescer(**options):
+    emitted = []
+    clock = FakeClock()
+    events = EventCoalescer(lambda *event: emitted.append(event), window=0.5, clock=clock, **options)
+    return events, clock, emitted
+
+
+def settle(events, clock):
+    clock.now += 10
+    events.flush()
+
+
+# ============ COALESCER ============
+
+def test_repeated_modifications_merge_into_one_event():
+    events, clock, emitted = coalescer()
+    for _ in range(5):
+        events.add('modified', '/d/a.txt')
+    settle(events, clock)
+    assert emitted == [('modified', '/d/a.txt', None, 5)]
+
+
+def test_created_then_deleted_temp_file_disappears():
+    events, clock, emitted = coalescer()
+    events.add('created', '/d/~tmp1.tmp')
+    events.add('modified', '/d/~tmp1.tmp')
+    events.add('deleted', '/d/~tmp1.tmp')
+    settle(events, clock)
+    assert emitted == []
+
+
+def test_deleted_and_recreated_in_place_is_a_modification():
+    events, clock, emitted = coalescer()
+    events.add('deleted', '/d/doc.txt')
+    events.add('created', '/d/doc.txt')
+    settle(events, clock)
+    assert emitted == [('modified', '/d/doc.txt', None, 2)]
+
+
+def test_delete_then_create_of_the_same_name_elsewhere_is_a_move():
+    events, clock, emitted = coalescer()
+    events.add('deleted', '/d/doc.txt')
+    events.add('created', '/e/doc.txt')
+    settle(events, clock)
+    assert emitted == [('moved', '/d/doc.txt', '/e/doc.txt', 2)]
+
+
+def test_temp_file_renamed_over_a_deleted_file_is_a_modification():
+    events, clock, emitted = coalescer()
+    events.add('created', '/d/t.tmp')
+    events.add('deleted', '/d/doc.txt')
+    events.add('moved', '/d/t.tmp', '/d/doc.txt')
+    settle(events, clock)
+    assert emitted == [('modified', '/d/doc.txt', None, 3)]
+
+
+def test_word_style_save_is_a_modification():
+    events, clock, emitted = coalescer()
+    events.add('moved', '/d/doc.txt', '/d/bak.tmp')
+    events.add('created', '/d/t.tmp')
+    events.add('moved', '/d/t.tmp', '/d/doc.txt')
+    events.add('deleted', '/d/bak.tmp')
+    settle(events, clock)
+    assert emitted == [('modified', '/d/doc.txt', None, 4)]
+
+
+def test_existing_file_renamed_over_a_deleted_one_is_a_move():
+    events, clock, emitted = coalescer()
+    events.add('deleted', '/d/doc.txt')
+    events.add('moved', '/d/new.txt', '/d/doc.txt')
+    settle(events, clock)
+    assert emitted == [('moved', '/d/new.txt', '/d/doc.txt', 2)]
+    assert events.deletes_by_name == {}
+
+
+def test_second_move_onto_a_name_reports_the_first_one_too():
+    events, clock, emitted = coalescer()
+    events.add('moved', '/d/a.txt', '/d/doc.txt')
+    events.add('moved', '/d/b.txt', '/d/doc.txt')
+    assert emitted == [('moved', '/d/a.txt', '/d/doc.txt', 1)]
+    settle(events, clock)
+    assert emitted[1:] == [('moved', '/d/b.txt', '/d/doc.txt', 1)]
+
+
+def test_moved_away_and_deleted_reports_the_original_deleted():
+    events, clock, emitted = coalescer()
+    events.add('moved', '/d/doc.txt', '/d/bak.tmp')
+    events.add('deleted', '/d/bak.tmp')
+    settle(events, clock)
+    assert emitted == [('deleted', '/d/doc.txt', None, 2)]
+
+
+def test_chained_renames_report_first_source_to_final_name():
+    events, clock, emitted = coalescer()
+    events.add('moved', '/d/a.txt', '/d/b.txt')
+    events.add('moved', '/d/b.txt', '/d/c.txt')
+    settle(events, clock)
+    assert emitted == [('moved', '/d/a.txt', '/d/c.txt', 2)]
+
+
+def test_events_are_held_until_their_window_passes():
+    events, clock, emitted = coalescer(path_windows={'/slow/': 5.0})
+    events.add('modified', '/d/a.txt')
+    events.add('modified', '/slow/b.txt')
+    clock.now = 1.0
+    assert events.flush() == 1 and emitted == [('modified', '/d/a.txt', None, 1)]
+    clock.now = 6.0
+    assert events.flush() == 1
+
+
+def test_oldest_path_is_emitted_early_past_max_pending():
+    events, clock, emitted = coalescer(max_pending=2)
+    for name in ('a', 'b', 'c'):
+        events.add('modified', f"/d/{name}.txt")
+    assert emitted == [('modified', '/d/a.txt', None, 1)]
+
+
+# ============ PATH FILTER ============
+
+def test_path_filter_excludes_unless_an_include_rule_matches():
+    rules = PathFilter(exclude_prefixes=['C:/Users/me/AppData'], exclude_extensions=['pyc'],
+                       exclude_globs=['*/node_modules/*'], include_globs=['*/start menu/programs/startup/*'])
+    assert not rules.allows('c:\\users\\me\\appdata\\local\\x.txt')
+    assert not rules.allows('C:/src/module.PYC')
+    assert not rules.allows('C:/src/node_modules/lib/index.js')
+    assert rules.allows('C:/Users/me/AppData/Roaming/Microsoft/Windows/Start Menu/Programs/Startup/run.lnk')
+    assert rules.allows('C:/Users/me/Documents/report.docx')
+    assert rules.dropped_total == 3 and rules.passed == 2
+    assert rules.dropped['ext:.pyc'] == 1
+
+
+def test_path_filter_keeps_a_move_if_either_end_is_kept():
+    rules = PathFilter(exclude_globs=['*/temp/*'])
+    assert rules.allows('C:/temp/download.part', 'C:/Users/me/Downloads/setup.exe')
+    assert not rules.allows('C:/temp/a', 'C:/temp/b')
+
+
+# ============ QUEUE ============
+
+def entry(i, severity='Low', path='/d/file.txt'):
+    return {'Event': f"event {i}", 'Severity': severity, 'FilePath': path}
+
+
+def drain(events):
+    taken = []
+    while True:
+        try:
+            taken.append(events.get_nowait()['Event'])
+        except queue.Empty:
+            return taken
+
+
+def test_drop_oldest_keeps_the_newest_events():
+    events = BoundedEventQueue(3)
+    for i in range(5):
+        assert events.put(entry(i))
+    assert drain(events) == ['event 2', 'event 3', 'event 4']
+    assert events.dropped == 2 and events.high_watermark == 3
+
+
+def test_drop_low_discards_the_lowest_severity_first():
+    events = BoundedEventQueue(3, 'drop_low')
+    events.put(entry(0, 'High'))
+    events.put(entry(1, 'Low'))
+    events.put(entry(2, 'Medium'))
+    assert events.put(entry(3, 'Critical'))
+    assert not events.put(entry(4, 'Info'))
+    assert drain(events) == ['event 0', 'event 2', 'event 3']
+    assert events.dropped == 2
+
+
+def test_sample_admits_a_share_per_directory_past_high_water():
+    events = BoundedEventQueue(100, 'sample', sample_keep=1, sample_every=10, high_water=0.1)
+    admitted = sum(events.put(entry(i, path=f"/d/{i}.txt")) for i in range(100))
+    assert admitted == 10 + 9
+    assert events.put(entry(100, path='/other/x.txt'))
+
+
+def test_block_drops_the_incoming_event_after_the_timeout():
+    events = BoundedEventQueue(1, 'block', block_timeout=0.01)
+    assert events.put(entry(0))
+    assert not events.put(entry(1))
+    assert drain(events) == ['event 0'] and events.dropped == 1
+    # Callers that cannot wait fall back to dropping the oldest
+    events.put(entry(2))
+    assert events.put_nowait(entry(3))
+    assert drain(events) == ['event 3']
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BoundedEventQueue(10, 'drop_newest')
@@ -0,0 +1,76 @@
+import os
+import time
+
+from journal import EventJournal, read_footer
+
+
+def make_rows(count, start_ts=1_700_000_000_000_000):
+    return [(start_ts + i, 'File System', 'File Created', 'Low', f"File created: f{i}.txt",
+             f"Path: C:\\Users\\me\\f{i}.txt", {'FilePath': f"C:\\Users\\me\\f{i}.txt"} if i % 2 else None)
+            for i in range(count)]
+
+
+def test_recovers_a_torn_tail_record(tmp_path):
+    rows = make_rows(1000)
+    journal = EventJournal(str(tmp_path), segment_bytes=1 << 40)
+    for row in rows:
+        journal.append(*row)
+    journal.close()
+
+    tail = journal.segments()[-1]
+    assert read_footer(tail) is None
+    with open(tail, 'r+b') as f:
+        f.truncate(os.path.getsize(tail) - 7)  # Inside the last record
+
+    reopened = EventJournal(str(tmp_path))
+    assert reopened.load() == rows[:-1]
+    assert reopened.recovered_bytes_dropped > 0
+
+    # Appending after recovery continues on a clean record boundary
+    reopened.append(*rows[-1])
+    reopened.close()
+    again = EventJournal(str(tmp_path))
+    assert again.load() == rows
+    again.close()
+
+
+def test_sealed_segments_are_indexed_and_filtered_by_time(tmp_path):
+    rows = make_rows(2000)
+    journal = EventJournal(str(tmp_path), segment_bytes=16 * 1024, index_every=16)
+    for row in rows:
+        journal.append(*row)
+    assert len(journal.segments()) > 2
+    assert journal.load() == rows
+    assert journal.load(since=rows[1500][0]) == rows[1500:]
+    journal.close()
+
+
+def test_prunes_oldest_segments_beyond_max_bytes(tmp_path):
+    journal = EventJournal(str(tmp_path), segment_bytes=16 * 1024, max_bytes=64 * 1024)
+    rows = make_rows(5000)
+    for row in rows:
+        journal.append(*row)
+    total = sum(os.path.getsize(path) for path in journal.segments())
+    assert journal.segments_pruned > 0
+    assert total <= 64 * 1024 + 16 * 1024
+    # What is left is the newest part, still contiguous
+    kept = journal.load()
+    assert kept == rows[-len(kept):]
+    journal.close()
+
+
+def test_prunes_segments_older_than_max_age_on_open(tmp_path):
+    now = time.time()
+    old = make_rows(500, start_ts=int((now - 3 * 3600) * 1_000_000))
+    journal = EventJournal(str(tmp_path), segment_bytes=8 * 1024)
+    for row in old:
+        journal.append(*row)
+    journal.close()
+    assert len(journal.segments()) > 1
+
+    reopened = EventJournal(str(tmp_path), max_age=3600)
+    # Only the unsealed tail survives: it is still being written to
+    assert len(reopened.segments()) == 1
+    assert reopened.segments_pruned > 0
+    reopened.close()
+
@@ -0,0 +1,25 @@
+import json
+
+from metrics import Metrics
+
+
+def test_dump_rolls_the_file_over_past_max_bytes(tmp_path):
+    metrics = Metrics()
+    path = str(tmp_path / 'metrics.jsonl')
+    metrics.incr('events', 5)
+    for _ in range(50):
+        metrics.dump(path, max_bytes=1000)
+    current = (tmp_path / 'metrics.jsonl').read_text(encoding='utf-8').splitlines()
+    previous = (tmp_path / 'metrics.jsonl.1').read_text(encoding='utf-8').splitlines()
+    assert (tmp_path / 'metrics.jsonl').stat().st_size < 1000 + len(current[-1]) + 1
+    assert (tmp_path / 'metrics.jsonl.1').stat().st_size >= 1000
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['metrics.jsonl', 'metrics.jsonl.1']
+    assert json.loads(current[-1])['counters']['events'] == 5 and previous
+
+
+def test_dump_appends_without_limit_by_default(tmp_path):
+    path = str(tmp_path / 'metrics.jsonl')
+    metrics = Metrics()
+    for _ in range(20):
+        metrics.dump(path)
+    assert len((tmp_path / 'metrics.jsonl').read_text(encoding='utf-8').splitlines()) == 20
@@ -0,0 +1,47 @@
+import datetime
+
+from processes import ProcessTracker
+from testkit.stubs import FakeProcess, fake_psutil
+
+
+def fake_process(pid):
+    return FakeProcess({'pid': pid, 'name': f"proc{pid}.exe", 'username': 'SYSTEM',
+                        'create_time': datetime.datetime.now().timestamp()})
+
+
+def test_first_poll_is_a_baseline():
+    tracker = ProcessTracker(fake_psutil([fake_process(pid) for pid in range(100, 200)], []))
+    assert tracker.poll() == ([], [])
+    assert len(tracker) == 100
+    assert sorted(info.pid for info in tracker.running()) == list(range(100, 200))
+
+
+def test_reports_starts_and_exits_since_the_last_poll():
+    psutil = fake_psutil([fake_process(pid) for pid in range(100, 200)], [])
+    tracker = ProcessTracker(psutil)
+    tracker.poll()
+    for pid in (105, 106):
+        del psutil.table[pid]
+    for pid in (500, 501, 502):
+        psutil.table[pid] = fake_process(pid)
+
+    started, exited = tracker.poll()
+    assert sorted(info.pid for info in started) == [500, 501, 502]
+    assert sorted(info.pid for info in exited) == [105, 106]
+    assert all(info.name == f"proc{info.pid}.exe" for info in started + exited)
+    assert len(tracker) == 101
+    assert tracker.poll() == ([], [])
+
+
+def test_reused_pid_is_reported_as_an_exit_and_a_start():
+    psutil = fake_psutil([fake_process(pid) for pid in range(100, 110)], [])
+    tracker = ProcessTracker(psutil)
+    tracker.poll()
+    old = psutil.table[105].info
+    psutil.table[105] = FakeProcess({**old, 'name': 'other.exe', 'create_time': old['create_time'] + 30})
+
+    started, exited = tracker.poll()
+    assert [(info.pid, info.name) for info in started] == [(105, 'other.exe')]
+    assert [(info.pid, info.name) for info in exited] == [(105, 'proc105.exe')]
+    assert len(tracker) == 10 and tracker.table[105].name == 'other.exe'
+    assert tracker.poll() == ([], [])
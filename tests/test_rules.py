@@ -0,0 +1,41 @@
+from rules import RuleEngine
+from service import RULES_FILE, MonitorService
+from testkit.reference import naive_match
+from testkit.synthetic import EventGenerator, synthetic_rules
+
+
+def deletion(path):
+    return {'Source': 'File System', 'Type': 'File Deleted', 'Severity': 'Medium',
+            'Event': 'File deleted', 'Details': f"Path: {path}", 'FilePath': path}
+
+
+def test_matches_agree_with_a_rule_by_rule_matcher():
+    events = list(EventGenerator(1).entries(300))
+    for count in (0, 100, 1000):
+        specs = synthetic_rules(count, 1)
+        engine = RuleEngine(specs)
+        for log in events:
+            assert engine.match(log) == naive_match(specs, log), log
+
+
+def test_shipped_rules_load_and_raise_system_folder_deletions():
+    engine = RuleEngine.load(RULES_FILE)
+    assert len(engine) > 1
+    log = deletion('C:\\Windows\\System32\\drivers\\etc\\hosts')
+    assert engine.apply([log]) == 1
+    assert 'FILE-SYSTEM-DELETE' in log['Rules'].split(',') and log['Severity'] == 'High'
+
+
+def test_missing_or_invalid_rules_fall_back_to_the_default_rules(tmp_path):
+    invalid = tmp_path / 'invalid.json'
+    invalid.write_text('{"rules": [', encoding='utf-8')
+    for path in (tmp_path / 'missing.json', invalid):
+        monitor = MonitorService.__new__(MonitorService)
+        errors = []
+        monitor.add_error_log = errors.append
+        engine = monitor.load_rules(str(path))
+        assert list(engine.rules) == ['FILE-SYSTEM-DELETE']
+        assert len(errors) == 1 and path.name in errors[0]
+
+        log = deletion('C:\\Program Files\\App\\app.exe')
+        assert engine.apply([log]) == 1 and log['Severity'] == 'High'
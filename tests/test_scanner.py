@@ -0,0 +1,61 @@
+import os
+import shutil
+
+from scanner import StatCacheScanner
+
+
+def build_tree(root, dirs=20, files=10):
+    for d in range(dirs):
+        directory = os.path.join(root, f"group{d % 10}", f"dir{d}")
+        os.makedirs(directory, exist_ok=True)
+        for f in range(files):
+            with open(os.path.join(directory, f"file{f}.dll"), 'wb') as out:
+                out.write(b'x' * (f % 64))
+
+
+def baseline(tmp_path, **options):
+    root = str(tmp_path / 'tree')
+    build_tree(root)
+    scanner = StatCacheScanner([root], str(tmp_path / 'scan_cache.json'), workers=2, **options)
+    scanner.scan()
+    scanner.commit()
+    return root, scanner
+
+
+def test_added_removed_and_removed_directory_found_through_directory_mtimes(tmp_path):
+    root, scanner = baseline(tmp_path, verify_every=3)
+    directory = os.path.join(root, 'group1', 'dir1')
+    os.remove(os.path.join(directory, 'file3.dll'))
+    with open(os.path.join(directory, 'new.dll'), 'wb') as out:
+        out.write(b'new')
+    shutil.rmtree(os.path.join(root, 'group2', 'dir2'))
+
+    changes = scanner.scan()  # Not a verify scan
+    scanner.commit()
+    kinds = sorted((kind, os.path.relpath(path, root)) for kind, path, _, _ in changes)
+    expected = [('added', os.path.join('group1', 'dir1', 'new.dll')),
+                ('removed', os.path.join('group1', 'dir1', 'file3.dll'))]
+    expected += [('removed', os.path.join('group2', 'dir2', f"file{f}.dll")) for f in range(10)]
+    assert kinds == sorted(expected)
+    assert scanner.stats['directories_skipped'] > 0
+
+
+def test_in_place_rewrite_is_caught_by_the_next_verify_scan(tmp_path):
+    root, scanner = baseline(tmp_path, verify_every=3)
+    path = os.path.join(root, 'group3', 'dir3', 'file5.dll')
+    directory_mtime = os.stat(os.path.dirname(path)).st_mtime_ns
+    with open(path, 'wb') as out:
+        out.write(b'changed contents')
+    os.utime(os.path.dirname(path), ns=(directory_mtime, directory_mtime))
+
+    found = []
+    for _ in range(scanner.verify_every):
+        found.extend(scanner.scan())
+        scanner.commit()
+    assert [(kind, p) for kind, p, _, _ in found] == [('modified', path)]
+
+
+def test_snapshot_survives_a_restart(tmp_path):
+    root, scanner = baseline(tmp_path)
+    restarted = StatCacheScanner([root], scanner.path, workers=2)
+    assert restarted.scan() == []
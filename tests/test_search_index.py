@@ -0,0 +1,82 @@
+import datetime
+import random
+import threading
+
+from event_store import EventStore
+from search_index import SearchIndex
+from service import MonitorService
+
+WORDS = ['report', 'invoice', 'setup', 'svchost', 'powershell', 'update', 'backup', 'ab']
+SOURCES = ['File System', 'Process', 'Network', 'Event Log']
+
+
+def entries(count, seed=1):
+    rng = random.Random(seed)
+    base = datetime.datetime(2024, 1, 1)
+    return [{'Time': base + datetime.timedelta(seconds=i), 'Source': rng.choice(SOURCES),
+             'Type': rng.choice(['File Created', 'Process Started', 'Info']), 'Severity': 'Low',
+             'Event': f"{rng.choice(WORDS)} {i}", 'Details': f"Path: C:/data/{rng.choice(WORDS)}_{i}.txt"}
+            for i in range(count)]
+
+
+def brute_force(store, query):
+    query = query.lower()
+    found = set()
+    for event_id in store.ids():
+        log = store.get(event_id)
+        if any(query in log[field].lower() for field in ('Event', 'Details', 'Type', 'Source')):
+            found.add(event_id)
+    return found
+
+
+def test_update_works_in_slices():
+    store = EventStore()
+    store.extend(entries(1000), record=False)
+    index = SearchIndex(store, slice_events=100)
+    assert index.update(blocking=False) is False
+    assert index.indexed_upto == store.base_id + 100
+    assert index.update() is True
+    assert index.indexed_upto == store.next_id
+
+
+def test_update_does_not_wait_for_another_thread_indexing():
+    store = EventStore()
+    store.extend(entries(10), record=False)
+    index = SearchIndex(store)
+    with index.lock:
+        result = []
+        worker = threading.Thread(target=lambda: result.append(index.update(blocking=False)))
+        worker.start()
+        worker.join(1)
+        assert result == [False]
+    assert index.indexed_upto == store.base_id
+
+
+def test_search_covers_events_not_indexed_yet():
+    store = EventStore()
+    store.extend(entries(3000), record=False)
+    index = SearchIndex(store, slice_events=200)
+    for query in ('report', 'REPORT 1', 'ab', 'process', 'file created', '_29', 'missing'):
+        assert index.search(query) == brute_force(store, query), query
+    assert index.indexed_upto < store.next_id
+    index.update()
+    for query in ('report', 'report 1', 'report 12', 'network'):
+        assert index.search(query) == brute_force(store, query), query
+
+
+def test_restore_indexes_as_it_goes(tmp_path):
+    monitor = MonitorService(journal_dir=str(tmp_path), sources=[])
+    monitor.restore_journal()
+    logs = entries(5000)
+    now = datetime.datetime.now()
+    for log in logs:
+        log['Time'] = now
+    monitor.store.extend(logs)
+    monitor.close()
+
+    restored = MonitorService(journal_dir=str(tmp_path), sources=[])
+    restored.search_index.slice_events = 1000
+    assert restored.restore_journal() == 5000
+    assert restored.search_index.indexed_upto == restored.store.next_id
+    assert list(restored.search_ids('invoice')) == sorted(brute_force(restored.store, 'invoice'))
+    restored.close()
@@ -0,0 +1,28 @@
+import threading
+import time
+
+from ingest import QueueDrainer
+from service import MonitorService
+
+
+def no_events(cancel=None, since=None):
+    return []
+
+
+def test_status_lines_are_not_held_back_by_a_long_drain_interval(tmp_path, capsys):
+    monitor = MonitorService(journal_dir=str(tmp_path), sources=[no_events])
+    monitor.restore_journal()
+    # An idle queue backs the drainer off to seconds between polls
+    monitor.file_drainer = QueueDrainer(monitor.file_events_queue, min_interval=5000, busy_interval=5000,
+                                        max_interval=5000)
+    stop = threading.Event()
+    loop = threading.Thread(target=monitor.run_forever, kwargs={'refresh_interval': 0, 'status_interval': 0.1,
+                                                                'stop': stop})
+    loop.start()
+    time.sleep(0.65)
+    stop.set()
+    loop.join(5)
+    monitor.close()
+    assert not loop.is_alive()
+    status_lines = [line for line in capsys.readouterr().out.splitlines() if ' lag=' in line]
+    assert len(status_lines) >= 4
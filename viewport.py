@@ -0,0 +1,60 @@
+"""Row formatting behind the virtualized log view (no Tk needed)"""
+import datetime
+
+
+def format_log_entry(log):
+    """Return (text, tag) for one log entry"""
+    time_str = log['Time'].strftime("%H:%M:%S") if isinstance(log['Time'], datetime.datetime) else "N/A"
+
+    # Create colored entry (fixed line count so the view can virtualize)
+    entry = f"[{time_str}] [{log['Source']}] [{log['Type']}]\n"
+    event = log['Event'].replace('\n', ' | ')
+    entry += f"Event: {event}\n"
+
+    # Truncate details if too long
+    details = log['Details'].replace('\n', ' | ')
+    if len(details) > 200:
+        details = details[:197] + "..."
+    entry += f"Details: {details}\n"
+
+    entry += f"Severity: {log['Severity']}\n"
+    entry += "-" * 60 + "\n\n"
+
+    # Determine tag
+    if 'File System' == log['Source']:
+        if 'Deleted' in log['Type'] or 'Delete' in log['Type']:
+            tag = 'file_delete'
+        elif 'Created' in log['Type']:
+            tag = 'file_create'
+        elif 'Modified' in log['Type']:
+            tag = 'file_modify'
+        else:
+            tag = 'info'
+    else:
+        severity_tag = log['Severity'].lower()
+        tag = severity_tag if severity_tag in ['critical', 'high', 'medium', 'low', 'info'] else 'info'
+
+    return entry, tag
+
+
+def viewport_rows(store, ids, top, count, formatter=format_log_entry):
+    """Format the rows at newest-first positions top..top+count of ids
+
+    Returns (chunks, row_lines, row_ids): text/tag pairs ready for
+    Text.insert, plus the first text line and event id of each row.
+    """
+    chunks = []
+    row_lines = []
+    row_ids = []
+    line = 1
+    total = len(ids)
+    for position in range(top, min(total, top + count)):
+        event_id = ids[total - 1 - position]
+        log = store.get(event_id)
+        if log is not None:
+            entry, tag = formatter(log)
+            row_lines.append(line)
+            row_ids.append(event_id)
+            line += entry.count('\n')
+            chunks.extend((entry, tag))
+    return chunks, row_lines, row_ids